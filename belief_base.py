@@ -1,17 +1,167 @@
-import itertools
+import contextlib
+import hashlib
+
+from entailment import CNFConverter, Resolution
+from solver import IncrementalSolver
+
+
+def belief_digest(formula):
+    """128-bit digest of a formula string, combined by XOR into base fingerprints."""
+    return int.from_bytes(hashlib.blake2b(formula.encode('utf-8'), digest_size=16).digest(), 'little')
+
 
 class BeliefBase:
-    def __init__(self):
-        """initialize an empty belief base."""
+    def __init__(self, pool=None, incremental=False):
+        """
+        initialize an empty belief base.
+        if a FormulaPool is given, beliefs are interned in the pool and shared with other bases,
+        and the engine work of the base runs in the pool's Engine.
+        if incremental is set, an IncrementalSolver keeps the consistency status up to date.
+        """
         self.beliefs = set()
+        self.pool = pool
+        self.solver = IncrementalSolver() if incremental else None
+        self._compiled = None  # CompiledBase from the last compile(), dropped on change
+        self.atom_index = {}  # atom -> beliefs mentioning it, for query-relevance slicing
+        self.fingerprint = 0  # XOR of belief digests: equal belief sets have equal fingerprints
+        self._prover = None  # IncrementalSolver answering entails() when there is no self.solver
+        self._entailed = {}  # query -> beliefs the proof may depend on
+        self._not_entailed = {}  # query -> countermodel (atom -> bool)
+        self._dependents = {}  # belief -> queries whose entailment depends on it
+        self.entailment_stats = {'hits': 0, 'misses': 0, 'invalidated': 0}
 
     def add_belief(self, formula):
         """add a belief to the belief base."""
+        if formula in self.beliefs:
+            return
+        if self.pool is not None:
+            formula = self.pool.acquire(formula)
         self.beliefs.add(formula)
+        self.fingerprint ^= belief_digest(formula)
+        self._compiled = None
+        with self._engine():
+            atoms = Resolution.atoms(formula)
+        for atom in atoms:
+            self.atom_index.setdefault(atom, set()).add(formula)
+        if self.solver is not None:
+            self.solver.add_group(formula, self.clauses(formula))
+        if self._prover is not None:
+            self._prover.add_group(formula, self.clauses(formula))
+        if self._not_entailed:
+            #entailments survive additions; non-entailments only if their countermodel satisfies the belief
+            clauses = self.clauses(formula)
+            checker = self._clause_state()
+            for query, model in list(self._not_entailed.items()):
+                if not checker.satisfies(model, clauses):
+                    del self._not_entailed[query]
+                    self.entailment_stats['invalidated'] += 1
 
     def remove_belief(self, formula):
         """remove a belief (formula) from belief base if it exists."""
+        if formula not in self.beliefs:
+            return
         self.beliefs.discard(formula)
+        self.fingerprint ^= belief_digest(formula)
+        self._compiled = None
+        with self._engine():
+            atoms = Resolution.atoms(formula)
+        for atom in atoms:
+            holders = self.atom_index.get(atom)
+            if holders is not None:
+                holders.discard(formula)
+                if not holders:
+                    del self.atom_index[atom]
+        if self.solver is not None:
+            self.solver.remove_group(formula)
+        if self._prover is not None:
+            self._prover.remove_group(formula)
+        #non-entailments survive removals; entailments only if their proof did not use the belief
+        for query in self._dependents.pop(formula, ()):
+            support = self._entailed.pop(query, None)
+            if support is not None:
+                self.entailment_stats['invalidated'] += 1
+                for belief in support:
+                    dependents = self._dependents.get(belief)
+                    if belief != formula and dependents is not None:
+                        dependents.discard(query)
+                        if not dependents:
+                            del self._dependents[belief]
+        if self.pool is not None:
+            self.pool.release(formula)
+
+    def _engine(self):
+        """context in which a pooled base uses the pool's Engine rather than the current one."""
+        return self.pool.engine.activate() if self.pool is not None else contextlib.nullcontext()
+
+    def clauses(self, formula):
+        """return the clauses of a formula, from the shared pool when there is one."""
+        if self.pool is not None and formula in self.pool:
+            return self.pool.clauses(formula)
+        with self._engine():
+            return Resolution.flatten_to_clauses(CNFConverter.to_cnf(formula))
+
+    def relevant_beliefs(self, query):
+        """split the beliefs into those sharing atoms (transitively) with the query and the rest."""
+        with self._engine():
+            return Resolution.relevant_slice(list(self.beliefs), query, self.atom_index)
+
+    def _clause_state(self):
+        """the solver holding the clauses of every belief, built on first use and kept up to date."""
+        if self.solver is not None:
+            return self.solver
+        if self._prover is None:
+            self._prover = IncrementalSolver()
+            for formula in self.beliefs:
+                self._prover.add_group(formula, self.clauses(formula))
+        return self._prover
+
+    def entails(self, query):
+        """
+        check whether the belief base entails query (base ∧ ¬query unsatisfiable).
+        results are cached with what they depend on: an entailment with the beliefs
+        connected to the query, a non-entailment with a countermodel. adding a belief
+        keeps every entailment, removing one drops only the entailments that used it.
+        """
+        if query in self._entailed or query in self._not_entailed:
+            self.entailment_stats['hits'] += 1
+            return query in self._entailed
+        self.entailment_stats['misses'] += 1
+        prover = self._clause_state()
+        model = prover.find_model(self.clauses(f"¬({query})"))
+        if model is not None:
+            self._not_entailed[query] = model
+            return False
+        #with a consistent base only the beliefs sharing atoms with the query can take part in the proof
+        support = self.relevant_beliefs(query)[0] if prover.is_consistent() else self.beliefs
+        self._entailed[query] = frozenset(support)
+        for belief in support:
+            self._dependents.setdefault(belief, set()).add(query)
+        return True
+
+    def compile(self):
+        """
+        compile the belief base to decision-DNNF for repeated queries.
+        the compiled form is kept until the next add or remove.
+        """
+        if self._compiled is None:
+            from compilation import compile_base
+            with self._engine():
+                self._compiled = compile_base(self.beliefs)
+        return self._compiled
+
+    def is_consistent(self):
+        """check whether the belief base is consistent (constant time when incremental)."""
+        if self.solver is not None:
+            return self.solver.is_consistent()
+        with self._engine():
+            return Resolution.is_consistent(list(self.beliefs))
+
+    def is_consistent_with(self, formula):
+        """check whether the belief base stays consistent once formula is added."""
+        if self.solver is not None:
+            return self.solver.check(self.clauses(formula))
+        with self._engine():
+            return Resolution.is_consistent(list(self.beliefs) + [formula])
 
     def list_beliefs(self):
         """return a list of all beliefs in the belief base."""
@@ -19,7 +169,15 @@ class BeliefBase:
 
     def clear_beliefs(self):
         """clear all beliefs from belief base."""
-        self.beliefs.clear()
+        for formula in list(self.beliefs):
+            self.remove_belief(formula)
+
+    def __deepcopy__(self, memo):
+        """copy the beliefs but keep sharing the pool."""
+        copied = BeliefBase(pool=self.pool, incremental=self.solver is not None)
+        for formula in self.beliefs:
+            copied.add_belief(formula)
+        return copied
 
     def __len__(self):
         """return the number of beliefs in belief base."""
@@ -33,30 +191,9 @@ class BeliefBase:
         return "Belief Base:\n" + "\n".join(f"- {belief}" for belief in sorted_beliefs)
 
 
-#new Belief Base for the Mastermind game
-class MastermindBeliefBase:
-    def __init__(self, colors, code_length):
-        """
-        initialize the belief base with all possible code combinations.
-        """
-        self.colors = colors
-        self.code_length = code_length
-        self.possible_codes = list(itertools.product(colors, repeat=code_length))  #all possible combinations
-        self.beliefs = set(self.possible_codes)  #initial belief base contains all possible codes
-
-    def remove_belief(self, formula):
-        """remove a belief from the belief base."""
-        self.beliefs.discard(formula)
-
-    def add_belief(self, formula):
-        """add a belief to belief base."""
-        self.beliefs.add(formula)
-
-    def list_beliefs(self):
-        """return list of all beliefs in belief base."""
-        return list(self.beliefs)
-
-    def __str__(self):
-        """string representation of belief base."""
-        return f"Belief Base contains {len(self.beliefs)} possible codes"
-
+def __getattr__(name):
+    #the Mastermind base needs NumPy, so it lives in its own module and is only imported on demand
+    if name == 'MastermindBeliefBase':
+        from mastermind_base import MastermindBeliefBase
+        return MastermindBeliefBase
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,264 @@
+import sys
+from collections import OrderedDict
+
+from belief_base import BeliefBase
+from entailment import CNFConverter, Engine, Resolution
+
+
+class _PoolEntry:
+    __slots__ = ('formula', 'refcount', 'clauses', 'size')
+
+    def __init__(self, formula):
+        self.formula = formula
+        self.refcount = 0
+        self.clauses = None  # tuple of frozenset clauses, filled on first use
+        self.size = sys.getsizeof(formula)
+
+
+def deep_size(root, count_strings=True):
+    """
+    approximate memory held by an object graph (containers, plain objects and
+    their attributes), counting shared objects once. strings can be left out
+    when they are interned, and so accounted for, by a pool.
+    """
+    seen, size, stack = set(), 0, [root]
+    while stack:
+        obj = stack.pop()
+        if obj is None or id(obj) in seen or (isinstance(obj, str) and not count_strings):
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        elif hasattr(obj, '__dict__'):
+            stack.append(vars(obj))
+    return size
+
+
+class FormulaPool:
+    """
+    reference-counted interning pool for formula strings and clauses.
+    every belief base attached to the pool holds one reference per belief, so
+    identical formulas are stored once no matter how many bases contain them.
+    parsing, CNF conversion and the other engine work of attached bases run in
+    the pool's own bounded Engine, never in Engine.default, and that engine is
+    cleared once the last reference is released.
+    """
+
+    def __init__(self, engine_entries=1024):
+        self.engine = Engine(max_entries=engine_entries)
+        self._entries = {}  # formula string -> _PoolEntry
+        self._literals = {}  # interned literal strings shared by all clauses
+        self._bytes = 0  # running total of entry and literal sizes
+        self._references = 0  # beliefs currently holding an entry
+        self._engine_measured = (0, 0)  # (cache entries, bytes) at the last walk of the engine
+
+    def acquire(self, formula):
+        """take a reference to a formula and return the interned string."""
+        entry = self._entries.get(formula)
+        if entry is None:
+            entry = _PoolEntry(sys.intern(formula))
+            self._entries[entry.formula] = entry
+            self._bytes += entry.size
+        entry.refcount += 1
+        self._references += 1
+        return entry.formula
+
+    def release(self, formula):
+        """drop a reference to a formula, freeing it once nobody holds it."""
+        entry = self._entries.get(formula)
+        if entry is None:
+            return
+        entry.refcount -= 1
+        self._references -= 1
+        if entry.refcount <= 0:
+            del self._entries[formula]
+            self._bytes -= entry.size
+        if not self._entries:
+            #nothing references the pool any more, so nothing it converted is worth keeping
+            self._literals.clear()
+            self._bytes = 0
+            self.engine.clear_caches()
+
+    def clauses(self, formula):
+        """return the compiled clauses of a pooled formula as a tuple of frozensets."""
+        entry = self._entries[formula]
+        if entry.clauses is None:
+            with self.engine.activate():
+                flat = Resolution.flatten_to_clauses(CNFConverter.to_cnf(formula))
+            clauses = [frozenset(self._intern_literal(lit) for lit in clause) for clause in flat]
+            entry.clauses = tuple(clauses)
+            size = sys.getsizeof(entry.clauses) + sum(sys.getsizeof(clause) for clause in clauses)
+            entry.size += size
+            self._bytes += size
+        return entry.clauses
+
+    def _intern_literal(self, literal):
+        interned = self._literals.get(literal)
+        if interned is None:
+            interned = self._literals[literal] = sys.intern(literal)
+            self._bytes += sys.getsizeof(literal)
+        return interned
+
+    def refcount(self, formula):
+        """return how many beliefs currently reference a formula."""
+        entry = self._entries.get(formula)
+        return entry.refcount if entry else 0
+
+    def entry_size(self, formula):
+        """return the approximate number of bytes held for a formula."""
+        entry = self._entries.get(formula)
+        return entry.size if entry else 0
+
+    def references(self):
+        """return how many beliefs reference the pool, over all bases."""
+        return self._references
+
+    def engine_memory(self):
+        """
+        return the approximate number of bytes held by the caches of the pool's engine.
+        the caches are walked again only once their entry count has moved by more
+        than an eighth since the last walk, in between the bytes are scaled.
+        """
+        entries = sum(len(cache) for cache in self.engine.caches.values())
+        if not entries:
+            return 0
+        measured_entries, measured_bytes = self._engine_measured
+        if not measured_entries or abs(entries - measured_entries) * 8 > measured_entries:
+            filled = [cache._data for cache in self.engine.caches.values() if len(cache)]
+            measured_entries, measured_bytes = entries, deep_size(filled) - sys.getsizeof(filled)
+            self._engine_measured = (measured_entries, measured_bytes)
+        return measured_bytes * entries // measured_entries
+
+    def memory_usage(self):
+        """return the approximate number of bytes held by the pool, its engine included."""
+        return self._bytes + self.engine_memory()
+
+    def __contains__(self, formula):
+        return formula in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class BeliefBaseManager:
+    """
+    hosts many named belief bases (tenants) on top of one shared FormulaPool.
+    tenants are kept in least-recently-used order so that, when max_bytes is
+    set, idle tenants are evicted first. the budget is checked when a tenant is
+    created; a tenant handed out by get() may grow afterwards, so its bytes are
+    measured again at the next check.
+    """
+
+    def __init__(self, pool=None, max_bytes=None):
+        self.pool = pool or FormulaPool()
+        self.max_bytes = max_bytes
+        self._tenants = OrderedDict()  # name -> BeliefBase, least recently used first
+        self._owned = {}  # name -> bytes owned by the tenant at its last measurement
+        self._owned_total = 0
+        self._stale = set()  # tenants handed out since their last measurement
+
+    def create(self, name, beliefs=()):
+        """create a new tenant, optionally seeded with beliefs."""
+        if name in self._tenants:
+            raise ValueError(f"Tenant already exists: {name}")
+        base = BeliefBase(pool=self.pool)
+        for belief in beliefs:
+            base.add_belief(belief)
+        self._tenants[name] = base
+        self._measure(name)
+        self._enforce_budget(keep=name)
+        return base
+
+    def get(self, name):
+        """return a tenant's belief base and mark it as recently used."""
+        if name not in self._tenants:
+            raise KeyError(f"Unknown tenant: {name}")
+        self._tenants.move_to_end(name)
+        self._stale.add(name)
+        return self._tenants[name]
+
+    def drop(self, name):
+        """remove a tenant and release its references into the pool."""
+        if name not in self._tenants:
+            raise KeyError(f"Unknown tenant: {name}")
+        self._tenants.pop(name).clear_beliefs()
+        self._owned_total -= self._owned.pop(name)
+        self._stale.discard(name)
+
+    def names(self):
+        """return tenant names, least recently used first."""
+        return list(self._tenants)
+
+    def tenant_memory(self, name):
+        """
+        return the memory accounting of a tenant. owned bytes cover the base's own
+        indexes, solvers and entailment caches; shared formula bytes are split
+        evenly between every belief that references them and the pool's engine
+        between every belief in the pool, so the shared bytes of all tenants add
+        up to the pool's memory usage.
+        """
+        base = self._tenants[name]
+        owned = self._measure(name)
+        shared = 0.0
+        for belief in base.beliefs:
+            refcount = self.pool.refcount(belief)
+            if refcount:
+                shared += self.pool.entry_size(belief) / refcount
+        if self.pool.references():
+            shared += self.pool.engine_memory() * len(base) / self.pool.references()
+        return {'beliefs': len(base), 'owned_bytes': owned,
+                'shared_bytes': int(shared), 'total_bytes': owned + int(shared)}
+
+    def _measure(self, name):
+        """measure the bytes a tenant owns and update the running total."""
+        base = self._tenants[name]
+        #formula strings are interned in the pool and counted there
+        owned = deep_size([base.beliefs, base.atom_index, base.solver, base._prover, base._compiled,
+                           base._entailed, base._not_entailed, base._dependents], count_strings=False)
+        self._owned_total += owned - self._owned.get(name, 0)
+        self._owned[name] = owned
+        self._stale.discard(name)
+        return owned
+
+    def memory_usage(self):
+        """return the approximate number of bytes held by all tenants and the pool."""
+        for name in list(self._stale):
+            self._measure(name)
+        return self._owned_total + self.pool.memory_usage()
+
+    def evict(self, target_bytes=None, keep=None):
+        """evict least recently used tenants until memory usage is at most target_bytes."""
+        target = self.max_bytes if target_bytes is None else target_bytes
+        evicted = []
+        if target is None:
+            return evicted
+        usage = self.memory_usage()
+        for name in list(self._tenants):
+            if usage <= target:
+                break
+            if name == keep:
+                continue
+            pool_bytes = self.pool.memory_usage()
+            usage -= self._owned[name]
+            self.drop(name)
+            usage -= pool_bytes - self.pool.memory_usage()
+            evicted.append(name)
+        return evicted
+
+    def _enforce_budget(self, keep=None):
+        if self.max_bytes is not None:
+            for name in self.evict(keep=keep):
+                print(f"[MANAGER] Evicted tenant '{name}' to stay within {self.max_bytes} bytes")
+
+    def __contains__(self, name):
+        return name in self._tenants
+
+    def __len__(self):
+        return len(self._tenants)
+
+    def __getitem__(self, name):
+        return self.get(name)
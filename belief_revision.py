@@ -1,14 +1,23 @@
-from belief_base import MastermindBeliefBase
+from mastermind_base import MastermindBeliefBase
+from guess_strategy import GuessStrategy
 from itertools import product
 
 class BeliefMastermindAgent:
-    def __init__(self, colors, code_length):
+    def __init__(self, colors, code_length, strategy=None, feedback_table=None):
         """
         Initializes the agent with a belief base and random first guess.
+        strategy is a GuessStrategy or a strategy name ('minimax', 'entropy',
+        'expected_size'); without one the agent guesses the first remaining code.
+        feedback_table is an optional FeedbackTable turning feedback into lookups.
         """
         self.colors = colors
         self.code_length = code_length
         self.belief_base = MastermindBeliefBase(colors, code_length)
+        if feedback_table is not None:
+            self.belief_base.attach_feedback_table(feedback_table)
+        if isinstance(strategy, str):
+            strategy = GuessStrategy(strategy)
+        self.strategy = strategy
         self.first_guess = self.generate_first_guess()
         print(f"Initial Guess: {self.first_guess}")
 
@@ -16,12 +25,17 @@ class BeliefMastermindAgent:
         """
         Generates the first guess randomly.
         """
-        return self.belief_base.list_beliefs()[0]  # The first possible code in the list
+        if self.strategy is not None:
+            return self.strategy.choose(self.belief_base)
+        return self.belief_base.first_belief()  # The first possible code in the code space
 
     def give_feedback(self, guess, secret_code):
         """
         Evaluates the feedback for a guess (number of correct positions and colors).
         """
+        table = getattr(self.belief_base, 'feedback_table', None)
+        if table is not None:
+            return table.feedback(self.belief_base.encode(guess), self.belief_base.encode(secret_code))
         correct_positions = sum(1 for a, b in zip(guess, secret_code) if a == b)
         correct_colors = len(set(guess) & set(secret_code)) - correct_positions
         return correct_positions, correct_colors
@@ -30,20 +44,17 @@ class BeliefMastermindAgent:
         """
         Revisions the belief base based on feedback.
         """
-        correct_positions, correct_colors = feedback
-        possible_codes = list(self.belief_base.list_beliefs())
-
-        for code in possible_codes:
-            feedback_for_code = self.give_feedback(code, guess)
-            if feedback_for_code != feedback:
-                self.belief_base.remove_belief(code)
+        #one pass over the remaining codes, vectorized when NumPy is available
+        self.belief_base.revise(guess, feedback)
 
     def make_guess(self):
         """
         Makes a guess based on the revised belief base.
-        Here, we will simply select the first possible combination remaining in the belief base.
+        Without a strategy, we will simply select the first possible combination remaining in the belief base.
         """
-        return self.belief_base.list_beliefs()[0]
+        if self.strategy is not None:
+            return self.strategy.choose(self.belief_base)
+        return self.belief_base.first_belief()
 
     def play_game(self, secret_code, max_turns=10):
         """
@@ -0,0 +1,131 @@
+import argparse
+import contextlib
+import json
+import os
+import sys
+
+from belief_base import BeliefBase
+from entailment import Resolution
+from test_agm import BeliefRevisionAgent
+
+OPERATIONS = ('expand', 'contract', 'revise', 'entails')
+
+
+def read_base(path):
+    """read a belief base file: one formula per line, '#' starts a comment line."""
+    with open(path, encoding='utf-8') as handle:
+        return [line.strip() for line in handle if line.strip() and not line.lstrip().startswith('#')]
+
+
+def read_operations(lines):
+    """
+    parse a stream of operations, one per line, either as text
+        revise (A ∧ B)
+        contract A max
+    (a trailing 'max' or 'min' is the contraction selector) or as a JSON object
+        {"op": "revise", "formula": "(A ∧ B)", "selector": "max"}
+    yields (line number, operation dict or None, error or None).
+    """
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        if line.startswith('{'):
+            try:
+                operation = json.loads(line)
+            except json.JSONDecodeError as error:
+                yield number, None, f"Invalid JSON: {error}"
+                continue
+        else:
+            op, _, formula = line.partition(' ')
+            operation = {'op': op, 'formula': formula.strip()}
+            head, _, tail = operation['formula'].rpartition(' ')
+            if head and tail in ('max', 'min'):
+                operation['formula'], operation['selector'] = head.strip(), tail
+        if operation.get('op') not in OPERATIONS:
+            yield number, None, f"Unknown operation: {operation.get('op')}"
+        elif not operation.get('formula'):
+            yield number, None, "Missing formula"
+        else:
+            yield number, operation, None
+
+
+def apply_operations(agent, operations, default_selector='max'):
+    """apply parsed operations in order and yield one result dict per input line."""
+    for number, operation, error in operations:
+        if error is not None:
+            yield {'line': number, 'error': error}
+            continue
+        op, formula = operation['op'], operation['formula']
+        result = {'line': number, 'op': op, 'formula': formula}
+        try:
+            if op == 'entails':
+                result['result'] = Resolution.entails(agent.belief_base, formula)
+            else:
+                before = set(agent.belief_base.beliefs)
+                selector = operation.get('selector', default_selector)
+                if op == 'expand':
+                    agent.expand(formula)
+                elif op == 'contract':
+                    agent.contract(formula, selector)
+                else:
+                    agent.revise(formula, selector)
+                after = agent.belief_base.beliefs
+                result['added'] = sorted(after - before)
+                result['removed'] = sorted(before - after)
+                result['size'] = len(after)
+        except Exception as error:  # report and carry on with the rest of the stream
+            result['error'] = f"{type(error).__name__}: {error}"
+        yield result
+
+
+def write_results(results, out, flush_every=1):
+    """write results as JSON lines, flushing every flush_every lines (0: only at the end)."""
+    written = 0
+    for result in results:
+        out.write(json.dumps(result, ensure_ascii=False) + '\n')
+        written += 1
+        if flush_every and written % flush_every == 0:
+            out.flush()
+    out.flush()
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Apply a stream of belief revision operations and print the results as JSON lines.")
+    parser.add_argument('operations', nargs='?', default='-', help="operations file (default: stdin)")
+    parser.add_argument('--base', default=None, help="belief base file, one formula per line")
+    parser.add_argument('--selector', default='max', choices=('max', 'min'), help="default contraction selector")
+    parser.add_argument('--incremental', action='store_true', help="keep consistency up to date with a SAT solver")
+    parser.add_argument('--flush-every', type=int, default=1, help="flush output every N results (0: at the end)")
+    parser.add_argument('--verbose', action='store_true', help="send the engine's log to stderr")
+    parser.add_argument('--log', default=None, help="operation log directory: recover from it and append to it")
+    parser.add_argument('--snapshot-every', type=int, default=100, help="operations between log snapshots")
+    args = parser.parse_args(argv)
+
+    out = sys.stdout
+    #the engine logs with print(), keep it off the JSON output
+    with contextlib.ExitStack() as stack:
+        log = sys.stderr if args.verbose else stack.enter_context(open(os.devnull, 'w'))
+        source = sys.stdin if args.operations == '-' else stack.enter_context(
+            open(args.operations, encoding='utf-8'))
+        stack.enter_context(contextlib.redirect_stdout(log))
+
+        base = BeliefBase(incremental=args.incremental)
+        oplog = None
+        if args.log:
+            from oplog import OperationLog
+            oplog = OperationLog(args.log, args.snapshot_every)
+            stack.callback(oplog.close)
+            oplog.recover(base)
+        if args.base and not (oplog and not oplog.is_empty):
+            for formula in read_base(args.base):
+                base.add_belief(formula)
+        agent = BeliefRevisionAgent(base, log=oplog)
+        results = apply_operations(agent, read_operations(source), args.selector)
+        write_results(results, out, args.flush_every)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+from entailment import CNFConverter, Resolution
+from solver import atom_of
+
+#Knowledge compilation to decision-DNNF
+
+class Circuit:
+    """
+    a decision-DNNF circuit stored as a list of nodes in topological order
+    (children always come before their parents), so every query is one linear
+    pass over the node list. node kinds:
+      ('true',) / ('false',)
+      ('lit', literal)
+      ('and', child ids)            children share no atoms
+      ('decision', atom, hi, lo)    (atom ∧ hi) ∨ (¬atom ∧ lo)
+    """
+
+    def __init__(self):
+        self.nodes = []
+        self._unique = {}  # node -> id, so identical sub-circuits are shared
+        self.true = self.node(('true',))
+        self.false = self.node(('false',))
+        self.root = self.true
+
+    def node(self, node):
+        node_id = self._unique.get(node)
+        if node_id is None:
+            node_id = len(self.nodes)
+            self.nodes.append(node)
+            self._unique[node] = node_id
+        return node_id
+
+    def conjoin(self, children):
+        children = tuple(sorted(set(c for c in children if c != self.true)))
+        if self.false in children:
+            return self.false
+        if not children:
+            return self.true
+        if len(children) == 1:
+            return children[0]
+        return self.node(('and', children))
+
+    def decide(self, atom, hi, lo):
+        if hi == lo:
+            return hi
+        return self.node(('decision', atom, hi, lo))
+
+    def __len__(self):
+        return len(self.nodes)
+
+
+class DNNFCompiler:
+    """
+    exhaustive DPLL compiler: unit propagation, splitting into independent
+    components and caching of residual clause sets, as in c2d/Dsharp.
+    """
+
+    def __init__(self):
+        self.circuit = Circuit()
+        self._cache = {}  # residual clause set -> node id
+
+    def compile(self, clauses):
+        clauses = frozenset(frozenset(clause) for clause in clauses)
+        self.circuit.root = self._compile(clauses)
+        return self.circuit
+
+    def _compile(self, clauses):
+        if not clauses:
+            return self.circuit.true
+        if frozenset() in clauses:
+            return self.circuit.false
+        if clauses in self._cache:
+            return self._cache[clauses]
+
+        #unit propagation
+        units = []
+        residual = clauses
+        while True:
+            unit = next((clause for clause in residual if len(clause) == 1), None)
+            if unit is None:
+                break
+            lit = next(iter(unit))
+            units.append(self.circuit.node(('lit', lit)))
+            residual = self._condition(residual, lit)
+            if frozenset() in residual:
+                self._cache[clauses] = self.circuit.false
+                return self.circuit.false
+
+        children = list(units)
+        for component in self._components(residual):
+            children.append(self._decide(component))
+        result = self.circuit.conjoin(children)
+        self._cache[clauses] = result
+        return result
+
+    def _decide(self, clauses):
+        if clauses in self._cache:
+            return self._cache[clauses]
+        counts = {}
+        for clause in clauses:
+            for lit in clause:
+                atom = atom_of(lit)
+                counts[atom] = counts.get(atom, 0) + 1
+        atom = max(sorted(counts), key=counts.get)
+        hi = self._compile(self._condition(clauses, atom))
+        lo = self._compile(self._condition(clauses, Resolution.negate(atom)))
+        result = self.circuit.decide(atom, hi, lo)
+        self._cache[clauses] = result
+        return result
+
+    @staticmethod
+    def _condition(clauses, lit):
+        """simplify a clause set under the assumption that lit is true."""
+        neg = Resolution.negate(lit)
+        conditioned = set()
+        for clause in clauses:
+            if lit in clause:
+                continue
+            conditioned.add(clause - {neg} if neg in clause else clause)
+        return frozenset(conditioned)
+
+    @staticmethod
+    def _components(clauses):
+        """split a clause set into groups that share no atoms."""
+        parent = {}
+
+        def find(atom):
+            while parent[atom] != atom:
+                parent[atom] = parent[parent[atom]]
+                atom = parent[atom]
+            return atom
+
+        for clause in clauses:
+            atoms = [atom_of(lit) for lit in clause]
+            for atom in atoms:
+                parent.setdefault(atom, atom)
+            root = find(atoms[0])
+            for atom in atoms[1:]:
+                parent[find(atom)] = root
+
+        groups = {}
+        for clause in clauses:
+            groups.setdefault(find(atom_of(next(iter(clause)))), set()).add(clause)
+        return [frozenset(group) for group in groups.values()]
+
+
+class CompiledBase:
+    """
+    a belief base compiled to decision-DNNF. clausal entailment, consistency
+    with a term and model counting each take time linear in the circuit size.
+    """
+
+    def __init__(self, circuit, atoms):
+        self.circuit = circuit
+        self.atoms = sorted(atoms)
+        self._atom_bits = {atom: 1 << i for i, atom in enumerate(self.atoms)}
+
+    def is_consistent(self):
+        return self.consistent_with(())
+
+    def consistent_with(self, term):
+        """check whether the base is consistent with a conjunction of literals."""
+        term = set(term)
+        if any(Resolution.negate(lit) in term for lit in term):
+            return False  # the term itself has complementary literals
+        sat = []
+        for node in self.circuit.nodes:
+            kind = node[0]
+            if kind == 'true':
+                sat.append(True)
+            elif kind == 'false':
+                sat.append(False)
+            elif kind == 'lit':
+                sat.append(Resolution.negate(node[1]) not in term)
+            elif kind == 'and':
+                sat.append(all(sat[child] for child in node[1]))
+            else:
+                _, atom, hi, lo = node
+                sat.append((sat[hi] and Resolution.negate(atom) not in term) or
+                           (sat[lo] and atom not in term))
+        return sat[self.circuit.root]
+
+    def entails_clause(self, clause):
+        """check whether the base entails a disjunction of literals."""
+        return not self.consistent_with(Resolution.negate(lit) for lit in clause)
+
+    def entails(self, query):
+        """check whether the base entails a formula, one clause of its CNF at a time."""
+        cnf_ast = CNFConverter.to_cnf(query)
+        return all(self.entails_clause(clause) for clause in Resolution.flatten_to_clauses(cnf_ast))
+
+    def model_count(self, term=()):
+        """count the models of the base (optionally conditioned on a term) over its atoms."""
+        term = set(term)
+        if any(Resolution.negate(lit) in term for lit in term):
+            return 0
+        #atoms fixed by the term are not free when smoothing over missing atoms
+        fixed = 0
+        for lit in term:
+            fixed |= self._atom_bits.get(atom_of(lit), 0)
+        counts = []
+        scopes = []  # atoms below each node, as a bitmask
+        for node in self.circuit.nodes:
+            kind = node[0]
+            if kind in ('true', 'false'):
+                counts.append(1 if kind == 'true' else 0)
+                scopes.append(0)
+            elif kind == 'lit':
+                lit = node[1]
+                counts.append(0 if Resolution.negate(lit) in term else 1)
+                scopes.append(self._atom_bits.get(atom_of(lit), 0))
+            elif kind == 'and':
+                count, scope = 1, 0
+                for child in node[1]:
+                    count *= counts[child]
+                    scope |= scopes[child]
+                counts.append(count)
+                scopes.append(scope)
+            else:
+                _, atom, hi, lo = node
+                bit = self._atom_bits[atom]
+                scope = scopes[hi] | scopes[lo] | bit
+                count = 0
+                if Resolution.negate(atom) not in term:
+                    count += counts[hi] << (scope & ~scopes[hi] & ~bit & ~fixed).bit_count()
+                if atom not in term:
+                    count += counts[lo] << (scope & ~scopes[lo] & ~bit & ~fixed).bit_count()
+                counts.append(count)
+                scopes.append(scope)
+        root = self.circuit.root
+        everything = (1 << len(self.atoms)) - 1
+        return counts[root] << (everything & ~scopes[root] & ~fixed).bit_count()
+
+    def __len__(self):
+        return len(self.circuit)
+
+
+def compile_base(beliefs):
+    """compile a collection of beliefs (formula strings) into a CompiledBase."""
+    clauses = []
+    for belief in beliefs:
+        cnf_ast = CNFConverter.to_cnf(belief)
+        clauses.extend(Resolution.flatten_to_clauses(cnf_ast))
+    atoms = {atom_of(lit) for clause in clauses for lit in clause}
+    circuit = DNNFCompiler().compile(clauses)
+    return CompiledBase(circuit, atoms)
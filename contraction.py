@@ -3,11 +3,15 @@ import itertools
 
 class BeliefContraction:
     def __init__(self, belief_base, selector='max'):
+        self.source = belief_base
         self.belief_base = list(belief_base.beliefs)
         self.selector = selector
 
     def partial_meet_contract(self, formula):
-        remainder_sets = self._generate_remainders(formula)
+        #beliefs sharing no atoms with the formula are kept by every remainder,
+        #as long as they are consistent on their own
+        relevant, rest = self._slice(formula)
+        remainder_sets = self._generate_remainders(formula, relevant)
         if not remainder_sets:
             print(f"[INFO] No remainder sets found for: {formula}")
             return
@@ -21,12 +25,30 @@ class BeliefContraction:
 
         self.belief_base.clear()
         self.belief_base.extend(selected)
+        self.belief_base.extend(rest)
+        kept = set(self.belief_base)
+        for belief in list(self.source.beliefs):
+            if belief not in kept:
+                self.source.remove_belief(belief)
         print(f"[INFO] Contracted belief base to remove entailment of: {formula}")
 
-    def _generate_remainders(self, formula):
+    def _slice(self, formula):
+        if hasattr(self.source, 'relevant_beliefs'):
+            relevant, rest = self.source.relevant_beliefs(formula)
+        else:
+            relevant, rest = Resolution.relevant_slice(self.belief_base, formula)
+        if rest and not Resolution.satisfiable(rest):
+            return list(self.belief_base), []
+        if rest:
+            print(f"[INFO] Contracting over {len(relevant)} relevant beliefs, keeping {len(rest)} unrelated ones")
+        return relevant, rest
+
+    def _generate_remainders(self, formula, candidates=None):
+        if candidates is None:
+            candidates = self.belief_base
         remainders = []
-        for i in range(len(self.belief_base) + 1):
-            for subset in itertools.combinations(self.belief_base, i):
+        for i in range(len(candidates) + 1):
+            for subset in itertools.combinations(candidates, i):
                 if not Resolution.entails(list(subset), formula):
                     remainders.append(list(subset))
         return remainders
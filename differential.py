@@ -0,0 +1,285 @@
+import argparse
+import contextlib
+import itertools
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import truth_table
+from belief_base import BeliefBase
+from compilation import compile_base
+from entailment import CNFConverter, Engine, Resolution
+from solver import IncrementalSolver
+
+#formulas are generated as small trees so the oracle never goes through the parser:
+#  ('atom', name) | ('¬', child) | (connective, left, right)
+CONNECTIVES = ('∧', '∨', '→', '↔')
+
+
+def random_formula(rng, atoms, depth):
+    """return a random formula tree over atoms, at most depth connectives deep."""
+    if depth == 0 or rng.random() < 0.3:
+        node = ('atom', rng.choice(atoms))
+        return ('¬', node) if rng.random() < 0.3 else node
+    if rng.random() < 0.15:
+        return ('¬', random_formula(rng, atoms, depth - 1))
+    return (rng.choice(CONNECTIVES), random_formula(rng, atoms, depth - 1), random_formula(rng, atoms, depth - 1))
+
+
+def random_case(rng, num_atoms, depth, max_beliefs):
+    """return (belief trees, query tree)."""
+    atoms = [chr(ord('A') + i) for i in range(num_atoms)]
+    beliefs = [random_formula(rng, atoms, depth) for _ in range(rng.randint(0, max_beliefs))]
+    return beliefs, random_formula(rng, atoms, depth)
+
+
+def render(tree):
+    """write a formula tree in the syntax the engine parses."""
+    if tree[0] == 'atom':
+        return tree[1]
+    if tree[0] == '¬':
+        return '¬' + render(tree[1])
+    return f"({render(tree[1])} {tree[0]} {render(tree[2])})"
+
+
+def holds(tree, model):
+    kind = tree[0]
+    if kind == 'atom':
+        return model[tree[1]]
+    if kind == '¬':
+        return not holds(tree[1], model)
+    left, right = holds(tree[1], model), holds(tree[2], model)
+    if kind == '∧':
+        return left and right
+    if kind == '∨':
+        return left or right
+    if kind == '→':
+        return not left or right
+    return left == right
+
+
+def tree_atoms(tree):
+    if tree[0] == 'atom':
+        return {tree[1]}
+    return set().union(*(tree_atoms(child) for child in tree[1:]))
+
+
+def oracle(beliefs, query):
+    """reference answer: enumerate every assignment, one at a time."""
+    atoms = sorted(set().union(tree_atoms(query), *(tree_atoms(belief) for belief in beliefs)))
+    for values in itertools.product((False, True), repeat=len(atoms)):
+        model = dict(zip(atoms, values))
+        if all(holds(belief, model) for belief in beliefs) and not holds(query, model):
+            return False
+    return True
+
+
+#Backends: each takes formula strings and answers whether the beliefs entail the query
+
+def _resolution(beliefs, query):
+    return Engine(truth_tables=False).entails(beliefs, query)
+
+
+def _auto(beliefs, query):
+    return Engine().entails(beliefs, query)
+
+
+def _truth_table(beliefs, query):
+    with Engine().activate():
+        return truth_table.entails(beliefs, query)
+
+
+def _cnf_sat(beliefs, query):
+    with Engine().activate():
+        solver = IncrementalSolver()
+        for formula in beliefs + [f"¬({query})"]:
+            solver.add_group(formula, Resolution.flatten_to_clauses(CNFConverter.to_cnf(formula)))
+        return not solver.is_consistent()
+
+
+def _incremental(beliefs, query):
+    with Engine().activate():
+        base = BeliefBase(incremental=True)
+        for formula in beliefs:
+            base.add_belief(formula)
+        return not base.is_consistent_with(f"¬({query})")
+
+
+def _dnnf(beliefs, query):
+    with Engine().activate():
+        return compile_base(beliefs).entails(query)
+
+
+def _dependency_cache(beliefs, query):
+    """
+    walk a BeliefBase through a random sequence of adds and removes that ends at the
+    case's beliefs and check base.entails(query) against the oracle after every step,
+    so its cached answers have to be invalidated correctly. takes trees, not strings.
+    """
+    rng = random.Random(render(query) + '|' + '|'.join(render(belief) for belief in beliefs))
+    #negations make some states inconsistent, atoms of the query make some entail it
+    extras = [('¬', belief) for belief in beliefs] + [('atom', atom) for atom in sorted(tree_atoms(query))]
+    formula = render(query)
+    with Engine().activate():
+        base = BeliefBase()
+        current = {}  # rendered formula -> tree, the beliefs in the base
+
+        def step(tree):
+            text = render(tree)
+            if text in current:
+                del current[text]
+                base.remove_belief(text)
+            else:
+                current[text] = tree
+                base.add_belief(text)
+            if base.entails(formula) != oracle(list(current.values()), query):
+                raise AssertionError(f"stale answer for beliefs {sorted(current)}")
+
+        for _ in range(2 * len(beliefs + extras)):
+            step(rng.choice(beliefs + extras))
+        targets = {render(belief): belief for belief in beliefs}
+        for text, tree in list(current.items()):
+            if text not in targets:
+                step(tree)
+        for text, tree in targets.items():
+            if text not in current:
+                step(tree)
+        return base.entails(formula)
+
+
+BACKENDS = {
+    'resolution': _resolution,
+    'auto': _auto,
+    'truth_table': _truth_table,
+    'cnf_sat': _cnf_sat,
+    'incremental': _incremental,
+    'dnnf': _dnnf,
+    'dependency_cache': _dependency_cache,
+}
+#backends that ask the oracle about intermediate states of their own need the trees
+_TREE_BACKENDS = {'dependency_cache'}
+
+
+def run_backend(name, beliefs, query):
+    """answer a case (trees) with one backend; errors are returned as strings."""
+    try:
+        if name in _TREE_BACKENDS:
+            return BACKENDS[name](beliefs, query)
+        return BACKENDS[name]([render(belief) for belief in beliefs], render(query))
+    except Exception as error:
+        return f"{type(error).__name__}: {error}"
+
+
+def _subtrees(tree):
+    """smaller candidates for a tree: its children and, for connectives, an atom."""
+    if tree[0] == 'atom':
+        return []
+    return list(tree[1:]) + [next(('atom', atom) for atom in sorted(tree_atoms(tree)))]
+
+
+def shrink(name, beliefs, query):
+    """greedily simplify a disagreeing case while the backend still disagrees with the oracle."""
+    def disagrees(beliefs, query):
+        return run_backend(name, beliefs, query) != oracle(beliefs, query)
+
+    changed = True
+    while changed:
+        changed = False
+        candidates = [(beliefs[:i] + beliefs[i + 1:], query) for i in range(len(beliefs))]
+        for i, belief in enumerate(beliefs):
+            candidates += [(beliefs[:i] + [smaller] + beliefs[i + 1:], query) for smaller in _subtrees(belief)]
+        candidates += [(beliefs, smaller) for smaller in _subtrees(query)]
+        for candidate in candidates:
+            if disagrees(*candidate):
+                beliefs, query = candidate
+                changed = True
+                break
+    return beliefs, query
+
+
+def _check_chunk(cases, backends, shrink_limit):
+    """worker: run every backend on every case, shrinking the first few disagreements."""
+    seconds = {name: 0.0 for name in backends}
+    disagreements = []
+    with open(os.devnull, 'w') as sink, contextlib.redirect_stdout(sink):
+        for number, (beliefs, query) in cases:
+            expected = oracle(beliefs, query)
+            for name in backends:
+                start = time.perf_counter()
+                answer = run_backend(name, beliefs, query)
+                seconds[name] += time.perf_counter() - start
+                if answer != expected:
+                    entry = {'case': number, 'backend': name, 'expected': expected, 'answer': answer,
+                             'beliefs': [render(belief) for belief in beliefs], 'query': render(query)}
+                    if len(disagreements) < shrink_limit:
+                        small_beliefs, small_query = shrink(name, beliefs, query)
+                        #the shrunk case can disagree the other way round, so answer it again
+                        entry['shrunk'] = {'beliefs': [render(belief) for belief in small_beliefs],
+                                           'query': render(small_query),
+                                           'expected': oracle(small_beliefs, small_query),
+                                           'answer': run_backend(name, small_beliefs, small_query)}
+                    disagreements.append(entry)
+    return seconds, disagreements
+
+
+def fuzz(cases=500, seed=0, num_atoms=4, depth=3, max_beliefs=4, backends=None, workers=None, shrink_limit=20):
+    """
+    generate seeded random cases, run every backend on them across a process pool
+    and return a report with per-backend disagreements and throughput.
+    """
+    backends = list(backends or BACKENDS)
+    rng = random.Random(seed)
+    numbered = [(number, random_case(rng, num_atoms, depth, max_beliefs)) for number in range(cases)]
+    workers = workers or os.cpu_count() or 1
+    chunks = [numbered[i::workers] for i in range(workers) if numbered[i::workers]]
+
+    if workers > 1:
+        with ProcessPoolExecutor(workers) as executor:
+            futures = [executor.submit(_check_chunk, chunk, backends, shrink_limit) for chunk in chunks]
+            results = [future.result() for future in futures]
+    else:
+        results = [_check_chunk(numbered, backends, shrink_limit)]
+
+    report = {}
+    for name in backends:
+        seconds = sum(result[0][name] for result in results)
+        found = sorted((entry for result in results for entry in result[1] if entry['backend'] == name),
+                       key=lambda entry: entry['case'])
+        report[name] = {
+            'checks': cases,
+            'disagreements': found,
+            'checks_per_second': cases / seconds if seconds else float('inf'),
+        }
+    return report
+
+
+def print_report(report, max_examples=3):
+    for name, entry in report.items():
+        print(f"\n[FUZZ] Backend: {name}")
+        print(f"- disagreements: {len(entry['disagreements'])} of {entry['checks']}")
+        print(f"- throughput: {entry['checks_per_second']:.1f} checks/s")
+        for found in [found for found in entry['disagreements'] if 'shrunk' in found][:max_examples]:
+            shrunk = found['shrunk']
+            print(f"- case {found['case']}: shrunk to {shrunk['beliefs']} ⊨ {shrunk['query']}: "
+                  f"expected {shrunk['expected']}, got {shrunk['answer']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare entailment backends against a truth-table oracle.")
+    parser.add_argument('--cases', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--atoms', type=int, default=4, help="atoms per case")
+    parser.add_argument('--depth', type=int, default=3, help="maximum formula depth")
+    parser.add_argument('--beliefs', type=int, default=4, help="maximum beliefs per case")
+    parser.add_argument('--backends', nargs='+', default=list(BACKENDS), choices=list(BACKENDS))
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all CPUs)")
+    parser.add_argument('--examples', type=int, default=3, help="shrunk examples to print per backend")
+    args = parser.parse_args()
+
+    report = fuzz(args.cases, args.seed, args.atoms, args.depth, args.beliefs, args.backends, args.workers)
+    print_report(report, args.examples)
+
+
+if __name__ == "__main__":
+    main()
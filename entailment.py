@@ -1,10 +1,15 @@
 #!/usr/bin/env python
 # coding: utf-8
 
+import contextlib
+import contextvars
 import itertools
 import re
+import threading
 import time
-from functools import lru_cache
+from collections import OrderedDict
+
+from solver import IncrementalSolver
 
 #CNF Converter
 
@@ -44,10 +49,149 @@ class Formula:
         return self._hash
 
 
+#Engine state
+
+class EngineCache:
+    """
+    a cache of one Engine, optionally bounded to maxsize entries with
+    least-recently-used eviction. unbounded caches rely on single dict operations
+    being atomic (also on free-threaded builds); bounded ones reorder entries and
+    take their own lock. values are never None, so get() returning None means a
+    miss. hit and miss counts are not locked and may be approximate under threads.
+    """
+
+    def __init__(self, maxsize=None):
+        self.maxsize = maxsize
+        self._data = OrderedDict() if maxsize is not None else {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        if self.maxsize is None:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return value
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                if self.maxsize is not None:
+                    self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        if self.maxsize is None:
+            self._data[key] = value
+            return value
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+
+_active_engine = contextvars.ContextVar('active_engine', default=None)
+
+
+class Engine:
+    """
+    owns every cache and counter used by CNFConverter and Resolution. the static
+    methods of those classes work against the engine active in the current thread
+    or task (see activate), falling back to the shared Engine.default, so existing
+    callers keep their behaviour. separate engines never share state, every cache
+    has its own lock and can be bounded with max_entries, which makes engines safe
+    to use from thread pools, including on free-threaded CPython builds.
+    """
+
+    CACHES = ('cnf', 'parse', 'equiv', 'eliminate', 'negation', 'distribute',
+              'clauses', 'entails', 'atoms', 'satisfiable', 'signature', 'truth_tables', 'fragments')
+    #the CNF rewriting steps were lru_cache(maxsize=128) before engines existed
+    DEFAULT_SIZES = {'eliminate': 128, 'negation': 128, 'distribute': 128}
+    default = None
+
+    def __init__(self, max_entries=None, truth_tables=True, cache_sizes=None):
+        """cache_sizes maps cache names to their own bound, overriding max_entries."""
+        self.max_entries = max_entries
+        self.truth_tables = truth_tables  # model-check small signatures instead of resolving
+        cache_sizes = cache_sizes or {}
+        self.caches = {name: EngineCache(cache_sizes.get(name, max_entries)) for name in Engine.CACHES}
+        self.stats = {'truth_table': 0, 'horn': 0, '2cnf': 0, 'general': 0}  # how entailment checks were dispatched
+        self.last_dispatch = None  # dispatch decision of the most recent entailment check
+        self._stats_lock = threading.Lock()
+
+    @staticmethod
+    def current():
+        """return the engine the static methods use in this thread."""
+        return _active_engine.get() or Engine.default
+
+    @contextlib.contextmanager
+    def activate(self):
+        """make this engine the one used by CNFConverter and Resolution in this thread."""
+        token = _active_engine.set(self)
+        try:
+            yield self
+        finally:
+            _active_engine.reset(token)
+
+    def cache(self, name):
+        return self.caches[name]
+
+    def record_dispatch(self, fragment):
+        with self._stats_lock:
+            self.stats[fragment] += 1
+            self.last_dispatch = fragment
+
+    def to_cnf(self, formula):
+        with self.activate():
+            return CNFConverter.to_cnf(formula)
+
+    def entails(self, beliefs, query):
+        with self.activate():
+            return Resolution.entails(beliefs, query)
+
+    def is_consistent(self, beliefs):
+        with self.activate():
+            return Resolution.is_consistent(beliefs)
+
+    def satisfiable(self, beliefs):
+        with self.activate():
+            return Resolution.satisfiable(beliefs)
+
+    def cache_info(self):
+        """return {cache name: (entries, hits, misses)}."""
+        return {name: (len(cache), cache.hits, cache.misses) for name, cache in self.caches.items()}
+
+    def reset_stats(self):
+        with self._stats_lock:
+            for fragment in self.stats:
+                self.stats[fragment] = 0
+            self.last_dispatch = None
+
+    def clear_caches(self):
+        for cache in self.caches.values():
+            cache.clear()
+
+
+Engine.default = Engine(cache_sizes=Engine.DEFAULT_SIZES)
+
+
 class CNFConverter:
-    _cache = {}  # class-level cache for CNF conversions
-    _parse_cache = {}  # cache for parsed expressions
-    _equiv_cache = {}  # cache for equivalent formulas
+    #conversions, parses and equivalences are cached in the active Engine
 
     @staticmethod
     def normalize_formula(expr_str):
@@ -70,43 +214,53 @@ class CNFConverter:
 
         # cache the result
         key = (expr1, expr2)
-        if key in CNFConverter._equiv_cache:
-            return CNFConverter._equiv_cache[key]
+        engine = Engine.current()
+        cache = engine.cache('equiv')
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+        #small signatures are compared on their truth tables
+        if engine.truth_tables:
+            import truth_table
+            if truth_table.applicable([expr1, expr2], truth_table.AUTO_ATOMS) is not None:
+                return cache.put(key, truth_table.equivalent(expr1, expr2))
 
-        CNFConverter._equiv_cache[key] = False
-        return False
+        return cache.put(key, False)
 
     @staticmethod
     def parse(expr):
-        # check cache first
-        if expr in CNFConverter._parse_cache:
-            return CNFConverter._parse_cache[expr]
-
         expr = expr.replace(' ', '')  # remove spaces
 
+        # check cache first (keyed without spaces, as results are stored)
+        cache = Engine.current().cache('parse')
+        cached = cache.get(expr)
+        if cached is not None:
+            return cached
+
         # special case for double negation (¬¬X)
         if expr.startswith('¬¬') and len(expr) > 2:
             inner = expr[2:]
             inner_formula = CNFConverter.parse(inner)
-            CNFConverter._parse_cache[expr] = inner_formula
+            cache.put(expr, inner_formula)
             return inner_formula
 
         # handle simple cases directly for better performance
         if re.match(r'^[A-Za-z][A-Za-z0-9]*$', expr):
             result = Formula(expr)
-            CNFConverter._parse_cache[expr] = result
+            cache.put(expr, result)
             return result
 
         if expr.startswith('¬') and re.match(r'^¬[A-Za-z][A-Za-z0-9]*$', expr):
             atom = expr[1:]
             result = Formula('¬', Formula(atom))
-            CNFConverter._parse_cache[expr] = result
+            cache.put(expr, result)
             return result
 
         tokens = re.findall(r'¬|→|↔|∧|∨|\(|\)|[A-Za-z][A-Za-z0-9]*', expr)
         if not tokens:  # sanity check - if no tokens
             result = Formula('⊤')  # True constant as placeholder
-            CNFConverter._parse_cache[expr] = result
+            cache.put(expr, result)
             return result
 
         output = []
@@ -139,7 +293,7 @@ class CNFConverter:
                         raise ValueError(f"Mismatched parentheses in: {expr}")
                     ops.pop()  # remove the '('
                 else:
-                    while ops and ops[-1] != '(' and precedence(ops[-1]) >= precedence(token):
+                    while ops and ops[-1] != '(' and token != '¬' and precedence(ops[-1]) >= precedence(token):
                         op = ops.pop()
                         if op == '¬':
                             if not output:
@@ -152,6 +306,7 @@ class CNFConverter:
                             right = output.pop()
                             left = output.pop()
                             output.append(Formula(op, left, right))
+                    ops.append(token)
 
             while ops:
                 if ops[-1] == '(':
@@ -173,7 +328,7 @@ class CNFConverter:
                 raise ValueError(f"Empty formula: {expr}")
 
             result = output[0]
-            CNFConverter._parse_cache[expr] = result
+            cache.put(expr, result)
             return result
 
         except (IndexError, ValueError) as e:
@@ -183,16 +338,23 @@ class CNFConverter:
                     inner = inner[1:-1]
                 if re.match(r'^[A-Za-z][A-Za-z0-9]*$', inner):
                     result = Formula('¬', Formula(inner))
-                    CNFConverter._parse_cache[expr] = result
+                    cache.put(expr, result)
                     return result
 
             result = Formula('⊤')  # True constant as placeholder
-            CNFConverter._parse_cache[expr] = result
+            cache.put(expr, result)
             return result
 
     @staticmethod
-    @lru_cache(maxsize=128)
     def eliminate_implications(f):
+        cache = Engine.current().cache('eliminate')
+        result = cache.get(f)
+        if result is None:
+            result = cache.put(f, CNFConverter._eliminate_implications(f))
+        return result
+
+    @staticmethod
+    def _eliminate_implications(f):
         if f.op == '→':
             return Formula('∨', Formula('¬', CNFConverter.eliminate_implications(f.left)),
                            CNFConverter.eliminate_implications(f.right))
@@ -212,8 +374,15 @@ class CNFConverter:
             return f
 
     @staticmethod
-    @lru_cache(maxsize=128)
     def move_negation_inward(f):
+        cache = Engine.current().cache('negation')
+        result = cache.get(f)
+        if result is None:
+            result = cache.put(f, CNFConverter._move_negation_inward(f))
+        return result
+
+    @staticmethod
+    def _move_negation_inward(f):
         if f.op == '¬':
             neg = f.left
             if neg.op == '¬':
@@ -236,8 +405,15 @@ class CNFConverter:
             return f
 
     @staticmethod
-    @lru_cache(maxsize=128)
     def distribute_or_over_and(f):
+        cache = Engine.current().cache('distribute')
+        result = cache.get(f)
+        if result is None:
+            result = cache.put(f, CNFConverter._distribute_or_over_and(f))
+        return result
+
+    @staticmethod
+    def _distribute_or_over_and(f):
         if f.op == '∨':
             A = CNFConverter.distribute_or_over_and(f.left)
             B = CNFConverter.distribute_or_over_and(f.right)
@@ -264,36 +440,38 @@ class CNFConverter:
         timeout = 5  #5 seconds timeout
 
         #check cache first
-        if expr_str in CNFConverter._cache:
-            return CNFConverter._cache[expr_str]
+        cache = Engine.current().cache('cnf')
+        cached = cache.get(expr_str)
+        if cached is not None:
+            return cached
 
         #handle normalized forms
         normalized_expr = CNFConverter.normalize_formula(expr_str)
-        if normalized_expr != expr_str and normalized_expr in CNFConverter._cache:
-            result = CNFConverter._cache[normalized_expr]
-            CNFConverter._cache[expr_str] = result
-            return result
+        if normalized_expr != expr_str:
+            cached = cache.get(normalized_expr)
+            if cached is not None:
+                return cache.put(expr_str, cached)
 
         # handle double negation special case directly
         if expr_str.startswith('¬¬') and len(expr_str) > 2:
             inner = expr_str[2:]
             inner_cnf = CNFConverter.to_cnf(inner)
-            CNFConverter._cache[expr_str] = inner_cnf
-            CNFConverter._cache[normalized_expr] = inner_cnf
+            cache.put(expr_str, inner_cnf)
+            cache.put(normalized_expr, inner_cnf)
             return inner_cnf
 
         # handle simple atomic formulas directly
         if re.match(r'^[A-Za-z][A-Za-z0-9]*$', expr_str):
             result = Formula(expr_str)
-            CNFConverter._cache[expr_str] = result
-            CNFConverter._cache[normalized_expr] = result
+            cache.put(expr_str, result)
+            cache.put(normalized_expr, result)
             return result
 
         if expr_str.startswith('¬') and re.match(r'^¬[A-Za-z][A-Za-z0-9]*$', expr_str):
             atom = expr_str[1:]
             result = Formula('¬', Formula(atom))
-            CNFConverter._cache[expr_str] = result
-            CNFConverter._cache[normalized_expr] = result
+            cache.put(expr_str, result)
+            cache.put(normalized_expr, result)
             return result
 
         try:
@@ -303,8 +481,8 @@ class CNFConverter:
             if time.time() - start_time > timeout:
                 print(f"CNF conversion timeout for: {expr_str}")
                 result = Formula('⊤')
-                CNFConverter._cache[expr_str] = result
-                CNFConverter._cache[normalized_expr] = result
+                cache.put(expr_str, result)
+                cache.put(normalized_expr, result)
                 return result
 
             step1 = CNFConverter.eliminate_implications(parsed)
@@ -313,8 +491,8 @@ class CNFConverter:
             if time.time() - start_time > timeout:
                 print(f"CNF conversion timeout for: {expr_str}")
                 result = Formula('⊤')
-                CNFConverter._cache[expr_str] = result
-                CNFConverter._cache[normalized_expr] = result
+                cache.put(expr_str, result)
+                cache.put(normalized_expr, result)
                 return result
 
             step2 = CNFConverter.move_negation_inward(step1)
@@ -323,30 +501,29 @@ class CNFConverter:
             if time.time() - start_time > timeout:
                 print(f"CNF conversion timeout for: {expr_str}")
                 result = Formula('⊤')
-                CNFConverter._cache[expr_str] = result
-                CNFConverter._cache[normalized_expr] = result
+                cache.put(expr_str, result)
+                cache.put(normalized_expr, result)
                 return result
 
             step3 = CNFConverter.distribute_or_over_and(step2)
 
             #cache the result
-            CNFConverter._cache[expr_str] = step3
-            CNFConverter._cache[normalized_expr] = step3
+            cache.put(expr_str, step3)
+            cache.put(normalized_expr, step3)
             return step3
         except Exception as e:
             print(f"Error in CNF conversion for {expr_str}: {e}")
             #for error cases, provide a safe default
             result = Formula('⊤')  # True constant as placeholder
-            CNFConverter._cache[expr_str] = result
-            CNFConverter._cache[normalized_expr] = result
+            cache.put(expr_str, result)
+            cache.put(normalized_expr, result)
             return result
 
 #Resolution Engine
 
 class Resolution:
-    _negate_cache = {}  # cache for negations
-    _clause_cache = {}  # cache for clause generation
-    _entails_cache = {}  # cache for entailment results
+    #negations, clauses, entailment results, atoms and satisfiability are cached in the active Engine
+    stats = Engine.default.stats  # dispatch counters of the default engine
     
     @staticmethod
     def resolve(ci, cj):
@@ -360,33 +537,35 @@ class Resolution:
         for di in ci_set:
             neg_di = Resolution.negate(di)
             if neg_di in cj_set:
-                #found complementary literals
-                new_clause = (ci_set.union(cj_set)) - {di, neg_di}
-                if new_clause:  # Don't add empty set here
-                    resolvents.append(new_clause)
-                else:
+                #found complementary literals; a literal in both clauses stays in the resolvent
+                new_clause = (ci_set - {di}) | (cj_set - {neg_di})
+                if not new_clause:
                     #empty clause - contradiction found
                     resolvents.append(set())
                     return resolvents  #early termination
+                if not Resolution.is_tautology(new_clause):
+                    resolvents.append(new_clause)
         return resolvents
 
+    @staticmethod
+    def is_tautology(clause):
+        """check whether a clause contains a literal and its negation."""
+        return any(Resolution.negate(lit) in clause for lit in clause if not lit.startswith('¬'))
+
     @staticmethod
     def negate(literal):
-        #cache negation results
-        if literal in Resolution._negate_cache:
-            return Resolution._negate_cache[literal]
-            
+        #cheaper than any cache lookup, so not cached
         literal = literal.strip()
-        result = literal[1:] if literal.startswith('¬') else '¬' + literal
-        Resolution._negate_cache[literal] = result
-        return result
+        return literal[1:] if literal.startswith('¬') else '¬' + literal
 
     @staticmethod
     def flatten_to_clauses(ast):
         # Generate a cache key
         key = str(ast)
-        if key in Resolution._clause_cache:
-            return Resolution._clause_cache[key]
+        cache = Engine.current().cache('clauses')
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
             
         def collect_clauses(node):
             if node.op == '∧':
@@ -394,9 +573,7 @@ class Resolution:
             else:
                 return [Resolution.collect_literals(node)]
                 
-        result = collect_clauses(ast)
-        Resolution._clause_cache[key] = result
-        return result
+        return cache.put(key, collect_clauses(ast))
 
     @staticmethod
     def collect_literals(node):
@@ -417,32 +594,53 @@ class Resolution:
         start_time = time.time()
         timeout = 10  #10 seconds timeout for entire entailment check
         
-        # special case for empty belief base
-        if not belief_base:
-            return False
-            
+        #belief bases keep their own dependency-tracked entailment cache
+        if hasattr(belief_base, 'entails'):
+            return belief_base.entails(query)
+
+        #an empty belief base entails exactly the tautologies, which the refutation below finds
         #check for cached result
+        engine = Engine.current()
+        cache = engine.cache('entails')
         key = (tuple(sorted(belief_base)), query)
-        if key in Resolution._entails_cache:
-            return Resolution._entails_cache[key]
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
             
         #handle normalized forms
         normalized_query = CNFConverter.normalize_formula(query)
         if normalized_query != query:
-            normalized_key = (tuple(sorted(belief_base)), normalized_query)
-            if normalized_key in Resolution._entails_cache:
-                result = Resolution._entails_cache[normalized_key]
-                Resolution._entails_cache[key] = result
-                return result
+            cached = cache.get((tuple(sorted(belief_base)), normalized_query))
+            if cached is not None:
+                return cache.put(key, cached)
             
         #special case for double negation
         if query.startswith('¬¬') and len(query) > 2:
             inner_query = query[2:]
             result = Resolution.entails(belief_base, inner_query)
-            Resolution._entails_cache[key] = result
-            Resolution._entails_cache[(tuple(sorted(belief_base)), inner_query)] = result
+            cache.put(key, result)
+            cache.put((tuple(sorted(belief_base)), inner_query), result)
             return result
-            
+
+        #tractable fragments are decided exactly without saturation and small signatures outside
+        #them are model-checked over every assignment at once; the fragment is read off per-formula
+        #flags, so no clause set is built to decide this
+        fragment = Resolution.classify_formulas(list(belief_base) + [f"¬({query})"])
+        if fragment == 'general' and engine.truth_tables:
+            import truth_table
+            atoms = truth_table.applicable(list(belief_base) + [query], truth_table.AUTO_ATOMS)
+            if atoms is not None:
+                engine.record_dispatch('truth_table')
+                return cache.put(key, truth_table.entails(belief_base, query, atoms))
+
+        #only beliefs connected to the query's atoms can take part in a refutation;
+        #the rest matters only if it is inconsistent on its own
+        relevant, rest = Resolution.relevant_slice(belief_base, query)
+        if rest:
+            result = Resolution.entails(relevant, query) or not Resolution.satisfiable(rest)
+            cache.put(key, result)
+            return result
+
         try:
             clauses = []
             clause_set = set()  # For faster membership tests
@@ -453,12 +651,14 @@ class Resolution:
                     # Check if we've exceeded the timeout
                     if time.time() - start_time > timeout:
                         print(f"Entailment check timeout for query: {query}")
-                        Resolution._entails_cache[key] = False
+                        cache.put(key, False)
                         return False
                         
                     cnf_ast = CNFConverter.to_cnf(belief)
                     new_clauses = Resolution.flatten_to_clauses(cnf_ast)
                     for clause in new_clauses:
+                        if Resolution.is_tautology(clause):
+                            continue  #true in every model, can only produce tautological resolvents
                         frozen_clause = frozenset(clause)
                         if frozen_clause not in clause_set:
                             clause_set.add(frozen_clause)
@@ -473,27 +673,40 @@ class Resolution:
                 #check if we've exceeded the timeout
                 if time.time() - start_time > timeout:
                     print(f"Entailment check timeout for query: {query}")
-                    Resolution._entails_cache[key] = False
+                    cache.put(key, False)
                     return False
                     
-                negated_query_literals = Resolution.split_query_negate(query)
-                for lit in negated_query_literals:
-                    clause = {lit}
+                #the CNF of ¬(query), so conjunctive queries become several clauses
+                negated_cnf = CNFConverter.to_cnf(f"¬({query})")
+                for clause in Resolution.flatten_to_clauses(negated_cnf):
+                    if Resolution.is_tautology(clause):
+                        continue
                     frozen_clause = frozenset(clause)
                     if frozen_clause not in clause_set:
                         clause_set.add(frozen_clause)
-                        clauses.append(clause)
+                        clauses.append(set(clause))
             except Exception as e:
                 #if we can't negate the query properly, it's not entailed
                 print(f"Error negating query {query}: {e}")
-                Resolution._entails_cache[key] = False
+                cache.put(key, False)
                 return False
 
             #safety check for empty clauses list
             if not clauses:
-                Resolution._entails_cache[key] = False
+                cache.put(key, False)
                 return False
 
+            engine.record_dispatch(fragment)
+            if fragment != 'general':
+                if fragment == 'horn':
+                    result = not Resolution.horn_satisfiable(clauses)
+                else:
+                    result = not Resolution.two_cnf_satisfiable(clauses)
+                cache.put(key, result)
+                if normalized_query != query:
+                    cache.put((tuple(sorted(belief_base)), normalized_query), result)
+                return result
+
             #resolution loop with optimizations
             max_iterations = 100 
             iteration = 0
@@ -506,7 +719,7 @@ class Resolution:
             
                 if time.time() - start_time > timeout:
                     print(f"Entailment check timeout for query: {query}")
-                    Resolution._entails_cache[key] = False
+                    cache.put(key, False)
                     return False
                 
                 new_clauses_found = False
@@ -542,15 +755,15 @@ class Resolution:
                     #check if we've exceeded the timeout
                     if time.time() - start_time > timeout:
                         print(f"Entailment check timeout for query: {query}")
-                        Resolution._entails_cache[key] = False
+                        cache.put(key, False)
                         return False
                         
                     resolvents = Resolution.resolve(ci, cj)
                     for resolvent in resolvents:
                         if not resolvent:  # empty clause found
-                            Resolution._entails_cache[key] = True
+                            cache.put(key, True)
                             if normalized_query != query:
-                                Resolution._entails_cache[(tuple(sorted(belief_base)), normalized_query)] = True
+                                cache.put((tuple(sorted(belief_base)), normalized_query), True)
                             return True
                             
                         frozen_resolvent = frozenset(resolvent)
@@ -559,89 +772,228 @@ class Resolution:
                             clauses.append(resolvent)
                             new_clauses_found = True
                 
-                #if no new clauses found, we're done
-                if not new_clauses_found:
-                    Resolution._entails_cache[key] = False
+                #if no new clauses found and every pair has been tried, we're done
+                if not new_clauses_found and pair_count < max_pairs_per_iteration:
+                    cache.put(key, False)
                     if normalized_query != query:
-                        Resolution._entails_cache[(tuple(sorted(belief_base)), normalized_query)] = False
+                        cache.put((tuple(sorted(belief_base)), normalized_query), False)
                     return False
                 
                 #safety check - if too many clauses, abort
                 if len(clauses) > 10000:
                     print(f"Too many clauses generated for query: {query}")
-                    Resolution._entails_cache[key] = False
+                    cache.put(key, False)
                     if normalized_query != query:
-                        Resolution._entails_cache[(tuple(sorted(belief_base)), normalized_query)] = False
+                        cache.put((tuple(sorted(belief_base)), normalized_query), False)
                     return False
             
             #if we reach the iteration limit
             print(f"Resolution reached iteration limit for query: {query}")
-            Resolution._entails_cache[key] = False
+            cache.put(key, False)
             if normalized_query != query:
-                Resolution._entails_cache[(tuple(sorted(belief_base)), normalized_query)] = False
+                cache.put((tuple(sorted(belief_base)), normalized_query), False)
             return False
             
         except Exception as e:
             # catch any unexpected errors and return a safe default
             print(f"Error in entailment checking: {e}")
-            Resolution._entails_cache[key] = False
+            cache.put(key, False)
             return False
 
     @staticmethod
-    def split_query_negate(query):
-        #set timeout for query negation
-        start_time = time.time()
-        timeout = 2  #2 seconds timeout for query negation
-        
-        #handle normalized forms
-        normalized_query = CNFConverter.normalize_formula(query)
-        if normalized_query != query:
-            return Resolution.split_query_negate(normalized_query)
-            
-        #special case for double negation
-        if query.startswith('¬¬') and len(query) > 2:
-            inner = query[2:]
-            return Resolution.split_query_negate(inner)
-            
-        #handle simple cases directly
-        if re.match(r'^[A-Za-z][A-Za-z0-9]*$', query):
-            return [f'¬{query}']
-            
-        if query.startswith('¬') and re.match(r'^¬[A-Za-z][A-Za-z0-9]*$', query):
-            return [query[1:]]
-            
+    def classify(clauses):
+        """return 'horn', '2cnf' or 'general' for a clause set."""
+        if all(sum(1 for lit in clause if not lit.startswith('¬')) <= 1 for clause in clauses):
+            return 'horn'
+        if all(len(clause) <= 2 for clause in clauses):
+            return '2cnf'
+        return 'general'
+
+    @staticmethod
+    def fragment_flags(formula):
+        """return (horn, 2cnf): whether the non-tautological clauses of a formula are Horn / binary."""
         try:
-           
-            if time.time() - start_time > timeout:
-                print(f"Query negation timeout for: {query}")
-                #fallback for timeout
-                if query.startswith('¬'):
-                    return [query[1:]]
-                return [f'¬{query}']
-                
-            cnf_ast = CNFConverter.to_cnf(query)
-            disjuncts = Resolution.collect_literals(cnf_ast)
-            return [Resolution.negate(lit) for lit in disjuncts]
-        except Exception as e:
-            print(f"Error in query negation: {e}")
-            # for simple formulas, handle directly
-            if query.startswith('¬'):
-                inner = query[1:]
-                if inner.startswith('(') and inner.endswith(')'):
-                    inner = inner[1:-1]
-                return [inner]
-            return [f'¬{query}']
+            clauses = [clause for clause in Resolution.flatten_to_clauses(CNFConverter.to_cnf(formula))
+                       if not Resolution.is_tautology(clause)]
+        except Exception:
+            return (False, False)  # unparsable formulas are left to the general path
+        return (Resolution.classify(clauses) == 'horn', all(len(clause) <= 2 for clause in clauses))
+
+    @staticmethod
+    def classify_formulas(formulas):
+        """classify the joint clause set of formulas like classify(), without building it."""
+        cache = Engine.current().cache('fragments')
+        horn = binary = True
+        for formula in formulas:
+            flags = cache.get(formula) or cache.put(formula, Resolution.fragment_flags(formula))
+            horn, binary = horn and flags[0], binary and flags[1]
+            if not (horn or binary):
+                return 'general'
+        return 'horn' if horn else '2cnf'
+
+    @staticmethod
+    def horn_satisfiable(clauses):
+        """decide a Horn clause set by forward chaining, in time linear in its size."""
+        remaining = []  # number of body atoms of each clause not yet derived
+        heads = []
+        watchers = {}  # atom -> clauses with that atom in their body
+        agenda = []
+        for index, clause in enumerate(clauses):
+            body = [lit[1:] for lit in clause if lit.startswith('¬')]
+            head = next((lit for lit in clause if not lit.startswith('¬')), None)
+            remaining.append(len(body))
+            heads.append(head)
+            for atom in body:
+                watchers.setdefault(atom, []).append(index)
+            if not body:
+                if head is None:
+                    return False  # empty clause
+                agenda.append(head)
+
+        derived = set()
+        while agenda:
+            atom = agenda.pop()
+            if atom in derived:
+                continue
+            derived.add(atom)
+            for index in watchers.get(atom, ()):
+                remaining[index] -= 1
+                if remaining[index] == 0:
+                    if heads[index] is None:
+                        return False  # all-negative clause falsified
+                    agenda.append(heads[index])
+        return True
+
+    @staticmethod
+    def two_cnf_satisfiable(clauses):
+        """decide a 2-CNF clause set via strongly connected components of its implication graph."""
+        graph = {}
+        for clause in clauses:
+            literals = list(clause)
+            if not literals:
+                return False
+            a = literals[0]
+            b = literals[1] if len(literals) > 1 else a
+            graph.setdefault(Resolution.negate(a), []).append(b)
+            graph.setdefault(Resolution.negate(b), []).append(a)
+            graph.setdefault(a, [])
+            graph.setdefault(b, [])
+
+        #iterative Tarjan
+        index_of, low, component = {}, {}, {}
+        stack, on_stack = [], set()
+        counter = 0
+        for start in graph:
+            if start in index_of:
+                continue
+            work = [(start, iter(graph[start]))]
+            index_of[start] = low[start] = counter
+            counter += 1
+            stack.append(start)
+            on_stack.add(start)
+            while work:
+                node, children = work[-1]
+                advanced = False
+                for child in children:
+                    if child not in index_of:
+                        index_of[child] = low[child] = counter
+                        counter += 1
+                        stack.append(child)
+                        on_stack.add(child)
+                        work.append((child, iter(graph[child])))
+                        advanced = True
+                        break
+                    if child in on_stack:
+                        low[node] = min(low[node], index_of[child])
+                if advanced:
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index_of[node]:
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component[member] = node
+                        if member == node:
+                            break
+
+        return all(component[lit] != component.get(Resolution.negate(lit)) for lit in graph)
+
+    @staticmethod
+    def atoms(formula):
+        """return the atoms occurring in the clauses of a formula."""
+        cache = Engine.current().cache('atoms')
+        cached = cache.get(formula)
+        if cached is not None:
+            return cached
+        cnf_ast = CNFConverter.to_cnf(formula)
+        return cache.put(formula, frozenset(lit[1:] if lit.startswith('¬') else lit
+                                            for clause in Resolution.flatten_to_clauses(cnf_ast) for lit in clause))
+
+    @staticmethod
+    def relevant_slice(beliefs, query, atom_index=None):
+        """
+        split beliefs into those reachable from the query's atoms through shared
+        atoms and the rest. atom_index (atom -> beliefs) can be passed in by
+        callers that maintain one, otherwise it is built on the fly.
+        """
+        cache = Engine.current().cache('atoms')
+
+        def atoms(formula):
+            return cache.get(formula) or Resolution.atoms(formula)
+
+        if atom_index is None:
+            atom_index = {}
+            for belief in beliefs:
+                for atom in atoms(belief):
+                    atom_index.setdefault(atom, []).append(belief)
+
+        seen_atoms = set(atoms(query))
+        frontier = list(seen_atoms)
+        relevant = set()
+        while frontier:
+            atom = frontier.pop()
+            for belief in atom_index.get(atom, ()):
+                if belief in relevant:
+                    continue
+                relevant.add(belief)
+                for other in atoms(belief):
+                    if other not in seen_atoms:
+                        seen_atoms.add(other)
+                        frontier.append(other)
+
+        rest = [belief for belief in beliefs if belief not in relevant]
+        return [belief for belief in beliefs if belief in relevant], rest
+
+    @staticmethod
+    def satisfiable(beliefs):
+        """check whether a set of beliefs has a model, using the DPLL solver."""
+        key = frozenset(beliefs)
+        cache = Engine.current().cache('satisfiable')
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+        solver = IncrementalSolver()
+        for belief in key:
+            if not solver.add_group(belief, Resolution.flatten_to_clauses(CNFConverter.to_cnf(belief))):
+                break
+        return cache.put(key, solver.is_consistent())
 
     @staticmethod
     def is_consistent(belief_base):
+        #belief bases with an incremental solver already know the answer
+        if getattr(belief_base, 'solver', None) is not None:
+            return belief_base.is_consistent()
         return not Resolution.entails(belief_base, "False")
         
+    @staticmethod
+    def reset_stats():
+        """reset the dispatch counters of the active engine"""
+        Engine.current().reset_stats()
+
     @staticmethod
     def clear_caches():
-        """Clear all caches to free memory if needed"""
-        CNFConverter._cache.clear()
-        CNFConverter._parse_cache.clear()
-        CNFConverter._equiv_cache.clear()
-        Resolution._negate_cache.clear()
-        Resolution._clause_cache.clear()
-        Resolution._entails_cache.clear()
\ No newline at end of file
+        """Clear all caches of the active engine to free memory if needed"""
+        Engine.current().clear_caches()
\ No newline at end of file
@@ -0,0 +1,94 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from mastermind_base import MastermindBeliefBase, np
+
+
+def table_path(num_colors, code_length, directory='.'):
+    """return where the feedback table of a configuration is stored."""
+    return os.path.join(directory, f"feedback_{num_colors}x{code_length}.bin")
+
+
+def _fill_rows(path, num_colors, code_length, start, stop):
+    """compute rows [start, stop) of a feedback table file in place."""
+    base = MastermindBeliefBase(list(range(num_colors)), code_length)
+    num_codes = base.num_codes
+    matrix = np.memmap(path, dtype=np.uint8, mode='r+', shape=(num_codes, num_codes))
+    every_code = np.arange(num_codes, dtype=np.int64)
+    for row in range(start, stop):
+        positions, colors = base.score(every_code, base.decode(row))
+        matrix[row] = base.feedback_class(positions, colors)
+    matrix.flush()
+
+
+class FeedbackTable:
+    """
+    precomputed codes x codes matrix of feedback classes for one (colors, code_length)
+    configuration, memory-mapped read-only so every game and worker process shares
+    the same pages. entry [guess, code] is MastermindBeliefBase.feedback_class of the
+    feedback given by the rules of BeliefMastermindAgent.give_feedback. the table takes
+    num_codes ** 2 bytes, so it suits configurations up to a few tens of thousands of codes.
+    """
+
+    def __init__(self, path, num_colors, code_length):
+        if np is None:
+            raise RuntimeError("FeedbackTable requires NumPy")
+        self.path = path
+        self.num_colors = num_colors
+        self.code_length = code_length
+        self.num_codes = num_colors ** code_length
+        if os.path.getsize(path) != self.num_codes * self.num_codes:
+            raise ValueError(f"Feedback table {path} does not match {num_colors} colors x {code_length} pegs")
+        self.matrix = np.memmap(path, dtype=np.uint8, mode='r', shape=(self.num_codes, self.num_codes))
+
+    @staticmethod
+    def build(num_colors, code_length, directory='.', workers=None):
+        """compute the table in parallel and store it on disk, unless it already exists."""
+        if np is None:
+            raise RuntimeError("FeedbackTable requires NumPy")
+        if (code_length + 1) * (2 * code_length + 1) > 256:
+            raise ValueError("Feedback classes do not fit in uint8 for codes longer than 10 pegs")
+        path = table_path(num_colors, code_length, directory)
+        if os.path.exists(path):
+            return FeedbackTable(path, num_colors, code_length)
+
+        num_codes = num_colors ** code_length
+        partial = f"{path}.{os.getpid()}.tmp"
+        with open(partial, 'wb') as handle:
+            handle.truncate(num_codes * num_codes)
+        workers = workers or os.cpu_count() or 1
+        step = -(-num_codes // workers)
+        ranges = [(start, min(start + step, num_codes)) for start in range(0, num_codes, step)]
+        if workers > 1:
+            with ProcessPoolExecutor(workers) as executor:
+                futures = [executor.submit(_fill_rows, partial, num_colors, code_length, start, stop)
+                           for start, stop in ranges]
+                for future in futures:
+                    future.result()
+        else:
+            _fill_rows(partial, num_colors, code_length, 0, num_codes)
+        os.replace(partial, path)  #readers never see a half-written table
+        return FeedbackTable(path, num_colors, code_length)
+
+    @staticmethod
+    def open(num_colors, code_length, directory='.', build=True):
+        """map an existing table, building it first if allowed."""
+        path = table_path(num_colors, code_length, directory)
+        if not os.path.exists(path):
+            if not build:
+                raise FileNotFoundError(path)
+            return FeedbackTable.build(num_colors, code_length, directory)
+        return FeedbackTable(path, num_colors, code_length)
+
+    def classes(self, guess_index, indices):
+        """return the feedback classes of a guess against many codes."""
+        return self.matrix[guess_index, indices]
+
+    def feedback(self, guess_index, code_index):
+        """return (correct positions, correct colors) for one pair of codes."""
+        positions, colors = divmod(int(self.matrix[guess_index, code_index]), 2 * self.code_length + 1)
+        return positions, colors - self.code_length
+
+    def __reduce__(self):
+        #worker processes re-map the file instead of receiving a copy of the matrix
+        return (FeedbackTable, (self.path, self.num_colors, self.code_length))
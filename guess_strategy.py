@@ -0,0 +1,220 @@
+import math
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from mastermind_base import MastermindBeliefBase, np
+
+STRATEGIES = ('first', 'minimax', 'entropy', 'expected_size')
+
+
+def partition_counts(belief_base, survivors, guess):
+    """
+    return the sizes of the feedback classes (see MastermindBeliefBase.feedback_class)
+    that guess splits survivors into.
+    """
+    positions, colors = belief_base.score(survivors, guess)
+    if belief_base.vectorized:
+        classes = belief_base.feedback_class(np.asarray(positions), np.asarray(colors))
+        counts = np.bincount(classes, minlength=belief_base.num_classes)
+        return counts[counts > 0].tolist()
+    return list(Counter(belief_base.feedback_class(p, c) for p, c in zip(positions, colors)).values())
+
+
+def partition_table(belief_base, survivors, candidates):
+    """
+    vectorized kernel: return a candidates x classes array with the partition
+    histogram of every candidate guess (given as indices) over survivors.
+    """
+    num_classes = belief_base.num_classes
+    num_colors = len(belief_base.colors)
+    rows = np.arange(len(candidates))[:, None] * num_classes
+    if belief_base.feedback_table is not None:
+        classes = belief_base.feedback_table.matrix[np.ix_(candidates, survivors)].astype(np.int64)
+        counts = np.bincount((rows + classes).ravel(), minlength=len(candidates) * num_classes)
+        return counts.reshape(len(candidates), num_classes)
+    candidate_digits = belief_base.digits(candidates).astype(np.int64)
+    survivor_digits = belief_base.digits(survivors).astype(np.int64)
+    positions = np.zeros((len(candidates), len(survivors)), dtype=np.int64)
+    candidate_present = np.zeros(len(candidates), dtype=np.int64)
+    survivor_present = np.zeros(len(survivors), dtype=np.int64)
+    for peg in range(belief_base.code_length):
+        candidate_digit = candidate_digits[:, peg]
+        survivor_digit = survivor_digits[:, peg]
+        positions += candidate_digit[:, None] == survivor_digit[None, :]
+        candidate_present |= np.left_shift(1, candidate_digit)
+        survivor_present |= np.left_shift(1, survivor_digit)
+    common = candidate_present[:, None] & survivor_present[None, :]
+    shared = sum((common >> color) & 1 for color in range(num_colors))
+    classes = belief_base.feedback_class(positions, shared - positions)
+    counts = np.bincount((rows + classes).ravel(), minlength=len(candidates) * num_classes)
+    return counts.reshape(len(candidates), num_classes)
+
+
+def _minimax(counts, total):
+    return counts.max(axis=-1)
+
+
+def _expected_size(counts, total):
+    return (counts * counts).sum(axis=-1) / total
+
+
+def _entropy(counts, total):
+    #negated so that every strategy minimizes its score
+    p = counts / total
+    return (p * np.log2(np.where(p > 0, p, 1))).sum(axis=-1)
+
+
+def _score_counts(name, counts, total):
+    """score one histogram (a list) without NumPy."""
+    if name == 'minimax':
+        return max(counts)
+    if name == 'expected_size':
+        return sum(n * n for n in counts) / total
+    return sum(n / total * math.log2(n / total) for n in counts)
+
+
+_SCORES = {'minimax': _minimax, 'expected_size': _expected_size, 'entropy': _entropy}
+
+
+def _best_bound(name, total, num_classes):
+    """best score any guess could reach, used to stop scoring early."""
+    if name == 'minimax':
+        return math.ceil(total / num_classes)
+    if name == 'expected_size':
+        return total / num_classes
+    return -math.log2(min(total, num_classes))
+
+
+def _score_candidates(belief_base, name, survivors, survivor_set, candidates, deadline, block_cells=1 << 21):
+    """
+    score candidate indices and return the best (key, index). candidates are
+    scored in blocks; scoring stops early once a possible secret reaches the
+    best score any guess could have, or when the deadline has passed.
+    """
+    total = len(survivors)
+    bound = _best_bound(name, total, belief_base.num_classes)
+    block = max(1, block_cells // max(1, total))
+    best = None
+    for start in range(0, len(candidates), block):
+        chunk = candidates[start:start + block]
+        if belief_base.vectorized:
+            scores = _SCORES[name](partition_table(belief_base, survivors, chunk), total).tolist()
+        else:
+            scores = [_score_counts(name, partition_counts(belief_base, survivors, belief_base.decode(index)), total)
+                      for index in chunk]
+        for index, score in zip(chunk, scores):
+            #ties go to guesses that could be the secret, then to the lowest index
+            key = (score, index not in survivor_set, index)
+            if best is None or key < best[0]:
+                best = (key, index)
+        if best[0][0] <= bound + 1e-9 and not best[0][1]:
+            break  #nothing can beat a perfect split by a possible secret
+        if deadline is not None and time.time() > deadline:
+            break
+    return best
+
+
+_worker_base = None  #per-process MastermindBeliefBase used only for decoding and scoring
+
+
+def _init_worker(colors, code_length, feedback_table):
+    global _worker_base
+    _worker_base = MastermindBeliefBase(colors, code_length)
+    if feedback_table is not None:
+        _worker_base.attach_feedback_table(feedback_table)  #re-mapped, not copied
+
+
+def _score_chunk(name, survivors, candidates, deadline):
+    return _score_candidates(_worker_base, name, survivors, set(survivors), candidates, deadline)
+
+
+class GuessStrategy:
+    """
+    picks the next Mastermind guess by scoring candidate guesses on how they
+    partition the remaining codes:
+      minimax        smallest worst-case partition (Knuth)
+      expected_size  smallest expected partition size
+      entropy        largest information gain
+      first          the first remaining code, as before
+    survivors and candidates are sampled when the code space is large so the
+    per-turn latency stays bounded; scoring runs in a process pool when workers > 1.
+    samples are drawn from the strategy's seed, so callers playing several games
+    reseed() per game to make each game independent of the ones before it.
+    """
+
+    def __init__(self, name='minimax', workers=1, max_candidates=4096, max_survivors=20000,
+                 time_limit=None, seed=0):
+        if name not in STRATEGIES:
+            raise ValueError(f"Unknown strategy: {name}")
+        self.name = name
+        self.workers = workers
+        self.max_candidates = max_candidates
+        self.max_survivors = max_survivors
+        self.time_limit = time_limit
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self._executor = None
+        self._executor_config = None
+        self._openings = {}  #(colors, code_length) -> index of the guess for the untouched code space
+
+    def reseed(self, game):
+        """draw the samples of the next game from (seed, game) alone."""
+        self.rng = random.Random(f"{self.seed}/{game}")
+
+    def choose(self, belief_base):
+        """return the next guess for a MastermindBeliefBase."""
+        if self.name == 'first' or len(belief_base) <= 2:
+            return belief_base.first_belief()
+        #the opening only depends on the configuration, so it is scored once per strategy
+        opening_key = (tuple(belief_base.colors), belief_base.code_length)
+        opening = len(belief_base) == belief_base.num_codes
+        if opening and opening_key in self._openings:
+            return belief_base.decode(self._openings[opening_key])
+
+        #the cached opening is shared by every game, so its samples only depend on the seed
+        rng = random.Random(self.seed) if opening else self.rng
+        survivors = self._sample_survivors(belief_base, rng)
+        candidates = self._candidates(belief_base, survivors, rng)
+        deadline = time.time() + self.time_limit if self.time_limit else None
+
+        if self.workers > 1 and len(candidates) > self.workers:
+            executor = self._pool(belief_base)
+            chunks = [candidates[i::self.workers] for i in range(self.workers)]
+            futures = [executor.submit(_score_chunk, self.name, survivors, chunk, deadline) for chunk in chunks]
+            results = [future.result() for future in futures]
+            best = min(result for result in results if result is not None)
+        else:
+            best = _score_candidates(belief_base, self.name, survivors, set(survivors), candidates, deadline)
+        if opening:
+            self._openings[opening_key] = best[1]
+        return belief_base.decode(best[1])
+
+    def _sample_survivors(self, belief_base, rng):
+        if len(belief_base) <= self.max_survivors:
+            return [int(index) for indices in belief_base.survivors() for index in indices]
+        return belief_base.sample(self.max_survivors, rng)
+
+    def _candidates(self, belief_base, survivors, rng):
+        if belief_base.num_codes <= self.max_candidates:
+            return list(range(belief_base.num_codes))
+        #half the budget on possible secrets, the rest on arbitrary codes
+        half = self.max_candidates // 2
+        picked = survivors if len(survivors) <= half else rng.sample(survivors, half)
+        others = {rng.randrange(belief_base.num_codes) for _ in range(self.max_candidates - len(picked))}
+        return sorted(set(picked) | others)
+
+    def _pool(self, belief_base):
+        config = (tuple(belief_base.colors), belief_base.code_length, belief_base.feedback_table)
+        if self._executor is None or self._executor_config != config:
+            self.close()
+            self._executor = ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=config)
+            self._executor_config = config
+        return self._executor
+
+    def close(self):
+        """shut down the worker pool, if any."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
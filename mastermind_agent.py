@@ -1,10 +1,10 @@
 from belief_revision import BeliefMastermindAgent
 
 class MastermindAgent:
-    def __init__(self, colors, code_length):
+    def __init__(self, colors, code_length, strategy=None, feedback_table=None):
         self.colors = colors
         self.code_length = code_length
-        self.agent = BeliefMastermindAgent(colors, code_length)
+        self.agent = BeliefMastermindAgent(colors, code_length, strategy, feedback_table)
 
     def play_game(self, secret_code, max_turns=10):
         """play the game using belief revision agent"""
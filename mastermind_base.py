@@ -0,0 +1,255 @@
+import bisect
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, the Mastermind base falls back to a set of tuples
+    np = None
+
+
+#new Belief Base for the Mastermind game
+class MastermindBeliefBase:
+    chunk_size = 1 << 18  #codes decoded at once while scanning the bitmap
+
+    def __init__(self, colors, code_length):
+        """
+        initialize the belief base with all possible code combinations.
+        codes are never materialized: code i is the mixed-radix number whose digits
+        are color indices (in itertools.product order). remaining codes are kept as a
+        bitmap with one bit per code, then as a sorted list of indices once few remain.
+        """
+        self.colors = colors
+        self.code_length = code_length
+        self._color_index = {color: i for i, color in enumerate(colors)}
+        self._weights = [len(colors) ** (code_length - 1 - peg) for peg in range(code_length)]
+        self.num_codes = len(colors) ** code_length
+        self.vectorized = np is not None  #NumPy scores whole chunks of codes at once
+        self._count = self.num_codes
+        self._sparse = None  #sorted survivor indices once the bitmap is no longer worth it
+        self.feedback_table = None  #optional precomputed FeedbackTable for this configuration
+
+        num_bytes = (self.num_codes + 7) // 8
+        if self.vectorized:
+            self._bitmap = np.full(num_bytes, 0xFF, dtype=np.uint8)
+        else:
+            self._bitmap = bytearray(b'\xff') * num_bytes
+        if self.num_codes % 8:
+            self._bitmap[-1] = (1 << (self.num_codes % 8)) - 1
+
+    @property
+    def num_classes(self):
+        """number of feedback classes; see feedback_class."""
+        return (self.code_length + 1) * (2 * self.code_length + 1)
+
+    def feedback_class(self, positions, colors):
+        """
+        map feedback to a small non-negative class number (works on arrays too).
+        colors is offset by code_length because give_feedback counts distinct
+        shared colors, which can be lower than the number of correct positions.
+        """
+        return positions * (2 * self.code_length + 1) + colors + self.code_length
+
+    def feedback_from_class(self, feedback_class):
+        """inverse of feedback_class."""
+        positions, colors = divmod(feedback_class, 2 * self.code_length + 1)
+        return positions, colors - self.code_length
+
+    def attach_feedback_table(self, table):
+        """score guesses by table lookup instead of recomputing feedback."""
+        if (table.num_colors, table.code_length) != (len(self.colors), self.code_length):
+            raise ValueError("Feedback table was built for a different configuration")
+        self.feedback_table = table
+
+    def encode(self, code):
+        """return the index of a code (a tuple of colors)."""
+        index = 0
+        for color in code:
+            index = index * len(self.colors) + self._color_index[color]
+        return index
+
+    def decode(self, index):
+        """return the code (a tuple of colors) at an index."""
+        return tuple(self.colors[(index // weight) % len(self.colors)] for weight in self._weights)
+
+    def _has(self, index):
+        if self._sparse is not None:
+            position = bisect.bisect_left(self._sparse, index)
+            return position < len(self._sparse) and self._sparse[position] == index
+        return bool(self._bitmap[index >> 3] & (1 << (index & 7)))
+
+    def __contains__(self, code):
+        return self._has(self.encode(code))
+
+    def remove_belief(self, formula):
+        """remove a belief from the belief base."""
+        index = self.encode(formula)
+        if not self._has(index):
+            return
+        if self._sparse is None:
+            self._bitmap[index >> 3] &= ~(1 << (index & 7)) & 0xFF
+        elif self.vectorized:
+            self._sparse = np.delete(self._sparse, np.searchsorted(self._sparse, index))
+        else:
+            del self._sparse[bisect.bisect_left(self._sparse, index)]
+        self._count -= 1
+
+    def add_belief(self, formula):
+        """add a belief to belief base."""
+        index = self.encode(formula)
+        if self._has(index):
+            return
+        if self._sparse is None:
+            self._bitmap[index >> 3] |= 1 << (index & 7)
+        elif self.vectorized:
+            self._sparse = np.insert(self._sparse, np.searchsorted(self._sparse, index), index)
+        else:
+            bisect.insort(self._sparse, index)
+        self._count += 1
+
+    def survivors(self):
+        """yield the indices of the remaining codes in ascending chunks."""
+        if self._sparse is not None:
+            if len(self._sparse):
+                yield self._sparse
+            return
+        step = self.chunk_size // 8
+        for start in range(0, len(self._bitmap), step):
+            block = self._bitmap[start:start + step]
+            if self.vectorized:
+                indices = np.flatnonzero(np.unpackbits(block, bitorder='little')) + start * 8
+                if len(indices):
+                    yield indices
+            else:
+                indices = [(start + offset) * 8 + bit for offset, byte in enumerate(block) if byte
+                           for bit in range(8) if byte & (1 << bit)]
+                if indices:
+                    yield indices
+
+    def first_belief(self):
+        """return the remaining code with the lowest index, or None if there is none."""
+        for indices in self.survivors():
+            return self.decode(int(indices[0]))
+        return None
+
+    def list_beliefs(self):
+        """return list of all beliefs in belief base."""
+        return [self.decode(int(index)) for indices in self.survivors() for index in indices]
+
+    def sample(self, count, rng):
+        """return up to count distinct remaining code indices, drawn with a random.Random, sorted."""
+        if count >= self._count:
+            return [int(index) for indices in self.survivors() for index in indices]
+        if self._sparse is not None:
+            return sorted(rng.sample([int(index) for index in self._sparse], count))
+        #the bitmap is only kept while more than 1/64 of the codes remain, so rejection sampling is cheap
+        if self.vectorized:
+            generator = np.random.default_rng(rng.randrange(1 << 32))
+            picked = np.zeros(0, dtype=np.int64)
+            while len(picked) < count:
+                draws = generator.integers(0, self.num_codes, size=2 * count * self.num_codes // self._count)
+                hits = draws[(self._bitmap[draws >> 3] >> (draws & 7)) & 1 == 1]
+                picked = np.unique(np.concatenate([picked, hits]))
+            return sorted(generator.choice(picked, count, replace=False).tolist())
+        picked = set()
+        while len(picked) < count:
+            index = rng.randrange(self.num_codes)
+            if self._has(index):
+                picked.add(index)
+        return sorted(picked)
+
+    def digits(self, indices):
+        """return the color indices of a chunk of codes as a codes x pegs array."""
+        indices = np.asarray(indices, dtype=np.int64)
+        weights = np.array(self._weights, dtype=np.int64)
+        return ((indices[:, None] // weights) % len(self.colors)).astype(np.uint8)
+
+    def score(self, indices, guess):
+        """
+        return (correct positions, correct colors) of a chunk of codes against a guess,
+        using the same rules as give_feedback.
+        """
+        if self.feedback_table is not None:
+            classes = self.feedback_table.classes(self.encode(guess), np.asarray(indices, dtype=np.int64))
+            return self.feedback_from_class(classes.astype(np.int64))
+        guess_digits = [self._color_index[color] for color in guess]
+        if self.vectorized:
+            indices = np.asarray(indices, dtype=np.int64)
+            positions = np.zeros(len(indices), dtype=np.int64)
+            present = np.zeros(len(indices), dtype=np.int64)  #bit c set if color c occurs in the code
+            for weight, guess_digit in zip(self._weights, guess_digits):
+                digit = (indices // weight) % len(self.colors)
+                positions += digit == guess_digit
+                present |= np.left_shift(1, digit)
+            shared = sum((present >> color) & 1 for color in set(guess_digits))
+            return positions, shared - positions
+        positions, colors = [], []
+        for index in indices:
+            digits = [(index // weight) % len(self.colors) for weight in self._weights]
+            correct = sum(1 for a, b in zip(digits, guess_digits) if a == b)
+            positions.append(correct)
+            colors.append(len(set(digits) & set(guess_digits)) - correct)
+        return positions, colors
+
+    def feedback(self, guess):
+        """return the survivor indices and their (correct positions, correct colors) against guess."""
+        chunks = [(indices,) + tuple(self.score(indices, guess)) for indices in self.survivors()]
+        if not self.vectorized:
+            return ([i for chunk in chunks for i in chunk[0]], [p for chunk in chunks for p in chunk[1]],
+                    [c for chunk in chunks for c in chunk[2]])
+        if not chunks:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, empty
+        return tuple(np.concatenate([chunk[part] for chunk in chunks]) for part in range(3))
+
+    def revise(self, guess, feedback):
+        """keep only the codes that would have produced the observed feedback for guess."""
+        if self._sparse is not None:
+            positions, colors = self.score(self._sparse, guess)
+            if self.vectorized:
+                self._sparse = self._sparse[(positions == feedback[0]) & (colors == feedback[1])]
+            else:
+                self._sparse = [i for i, p, c in zip(self._sparse, positions, colors) if (p, c) == tuple(feedback)]
+            self._count = len(self._sparse)
+            return
+
+        self._revise_bitmap(guess, feedback)
+        if self._count <= self.num_codes // 64:
+            #a sorted index list is now smaller than the bitmap
+            if self.vectorized:
+                chunks = list(self.survivors())
+                self._sparse = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.int64)
+            else:
+                self._sparse = [index for indices in self.survivors() for index in indices]
+            self._bitmap = None
+
+    def _revise_bitmap(self, guess, feedback):
+        step = self.chunk_size // 8
+        self._count = 0
+        for start in range(0, len(self._bitmap), step):
+            block = self._bitmap[start:start + step]
+            if self.vectorized:
+                bits = np.unpackbits(block, bitorder='little')
+                offsets = np.flatnonzero(bits)
+                if not len(offsets):
+                    continue
+                positions, colors = self.score(offsets + start * 8, guess)
+                keep = (positions == feedback[0]) & (colors == feedback[1])
+                bits[offsets] = keep
+                self._bitmap[start:start + step] = np.packbits(bits, bitorder='little')
+                self._count += int(keep.sum())
+            else:
+                indices = [(start + offset) * 8 + bit for offset, byte in enumerate(block) if byte
+                           for bit in range(8) if byte & (1 << bit)]
+                positions, colors = self.score(indices, guess)
+                for index, p, c in zip(indices, positions, colors):
+                    if (p, c) == tuple(feedback):
+                        self._count += 1
+                    else:
+                        self._bitmap[index >> 3] &= ~(1 << (index & 7)) & 0xFF
+
+    def __len__(self):
+        """return the number of remaining codes."""
+        return self._count
+
+    def __str__(self):
+        """string representation of belief base."""
+        return f"Belief Base contains {len(self)} possible codes"
@@ -0,0 +1,120 @@
+from belief_base import BeliefBase
+from belief_revision import BeliefMastermindAgent
+
+
+def _clause(literals):
+    """write a clause as a formula string the CNF converter understands."""
+    if len(literals) == 1:
+        return literals[0]
+    return "(" + " ∨ ".join(literals) + ")"
+
+
+def _neg(literal):
+    return literal[1:] if literal.startswith('¬') else '¬' + literal
+
+
+class ConstraintMastermindAgent(BeliefMastermindAgent):
+    """
+    Mastermind agent that never enumerates the code space. pegs are encoded as
+    propositional atoms (P<peg>C<color> means the peg has that color) and every
+    feedback becomes a cardinality constraint, added as beliefs to an incremental
+    BeliefBase. the next guess is read off the solver's model, so it is always
+    consistent with all feedback so far; memory grows with the number of guesses,
+    not with colors ** code_length.
+    """
+
+    def __init__(self, colors, code_length):
+        self.colors = colors
+        self.code_length = code_length
+        self.strategy = None
+        self.belief_base = BeliefBase(incremental=True)
+        self.guesses = 0
+        self._add_code_constraints()
+        self.first_guess = self.generate_first_guess()
+        print(f"Initial Guess: {self.first_guess}")
+
+    def _peg(self, peg, color_index):
+        return f"P{peg}C{color_index}"
+
+    def _present(self, color_index):
+        return f"K{color_index}"
+
+    def _add_code_constraints(self):
+        """every peg has exactly one color; K<color> holds iff the color occurs somewhere."""
+        num_colors = len(self.colors)
+        for peg in range(self.code_length):
+            atoms = [self._peg(peg, c) for c in range(num_colors)]
+            self.belief_base.add_belief(_clause(atoms))
+            for a in range(num_colors):
+                for b in range(a + 1, num_colors):
+                    self.belief_base.add_belief(_clause([_neg(atoms[a]), _neg(atoms[b])]))
+        for c in range(num_colors):
+            pegs = [self._peg(peg, c) for peg in range(self.code_length)]
+            self.belief_base.add_belief(_clause([_neg(self._present(c))] + pegs))
+            for atom in pegs:
+                self.belief_base.add_belief(_clause([_neg(atom), self._present(c)]))
+
+    def _add_exactly(self, literals, count, tag):
+        """
+        add 'exactly count of literals are true' with a sequential counter:
+        S<tag>I<i>J<j> holds iff at least j of the first i literals are true.
+        """
+        n = len(literals)
+        if count < 0 or count > n:
+            raise ValueError(f"Impossible feedback: {count} of {n}")
+
+        def counter(i, j):
+            if j == 0:
+                return None  #always true
+            if j > i:
+                return False  #never true
+            return self._counter(tag, i, j)
+
+        for i in range(1, n + 1):
+            x = literals[i - 1]
+            for j in range(1, min(i, count + 1) + 1):
+                here, prev_same, prev_less = counter(i, j), counter(i - 1, j), counter(i - 1, j - 1)
+                #prev_same -> here
+                if prev_same:
+                    self.belief_base.add_belief(_clause([_neg(prev_same), here]))
+                #x and prev_less -> here
+                self.belief_base.add_belief(_clause([_neg(x)] + ([_neg(prev_less)] if prev_less else []) + [here]))
+                #here -> prev_same or x
+                self.belief_base.add_belief(_clause([_neg(here)] + ([prev_same] if prev_same else []) + [x]))
+                #here -> prev_same or prev_less
+                if prev_less:
+                    self.belief_base.add_belief(_clause([_neg(here)] + ([prev_same] if prev_same else []) + [prev_less]))
+
+        if count > 0:
+            self.belief_base.add_belief(counter(n, count))
+        if count < n:
+            self.belief_base.add_belief(f"¬{counter(n, count + 1)}")
+
+    def _counter(self, tag, i, j):
+        return f"S{tag}I{i}J{j}"
+
+    def revise_belief_base(self, guess, feedback):
+        """
+        add the feedback for guess as constraints: exactly feedback[0] pegs match
+        and exactly feedback[0] + feedback[1] of the guess's distinct colors occur.
+        """
+        self.guesses += 1
+        indices = [self.colors.index(color) for color in guess]
+        matches = [self._peg(peg, c) for peg, c in enumerate(indices)]
+        self._add_exactly(matches, feedback[0], f"{self.guesses}P")
+        present = [self._present(c) for c in sorted(set(indices))]
+        self._add_exactly(present, feedback[0] + feedback[1], f"{self.guesses}K")
+
+    def make_guess(self):
+        """read a code consistent with every constraint off the solver's model."""
+        if not self.belief_base.is_consistent():
+            return None
+        model = self.belief_base.solver.model
+        guess = []
+        for peg in range(self.code_length):
+            color = next((c for c in range(len(self.colors)) if model.get(self._peg(peg, c))), 0)
+            guess.append(self.colors[color])
+        return tuple(guess)
+
+    def generate_first_guess(self):
+        return self.make_guess()
@@ -0,0 +1,156 @@
+import json
+import os
+
+from belief_base import BeliefBase, belief_digest
+
+
+class OperationLog:
+    """
+    append-only log of the deltas that expand/contract/revise applied to a belief
+    base, with periodic snapshots. a directory holds
+      snapshot.json   {"seq": n, "beliefs": [...]}, the base after record n
+      log.jsonl       one {"seq", "op", "formula", "selector", "added", "removed"}
+                      record per operation
+    recovery loads the snapshot and applies the later deltas, so it never calls
+    the entailment engine. the base a log starts from is its first snapshot
+    (see attach). every snapshot_every records the log is compacted:
+    a new snapshot is written atomically and the records it covers are dropped.
+    """
+
+    SNAPSHOT = 'snapshot.json'
+    LOG = 'log.jsonl'
+
+    def __init__(self, directory, snapshot_every=100, durable=False):
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        self.durable = durable  # fsync every record, not just flush it
+        os.makedirs(directory, exist_ok=True)
+        self.snapshot_path = os.path.join(directory, OperationLog.SNAPSHOT)
+        self.log_path = os.path.join(directory, OperationLog.LOG)
+        snapshot_seq, _, records, valid_bytes = self._read()
+        if os.path.exists(self.log_path) and os.path.getsize(self.log_path) > valid_bytes:
+            #drop a record torn by a crash, so new records start on a clean line
+            with open(self.log_path, 'r+b') as handle:
+                handle.truncate(valid_bytes)
+        self.seq = records[-1]['seq'] if records else snapshot_seq
+        self.pending = sum(1 for record in records if record['seq'] > snapshot_seq)
+        self._handle = open(self.log_path, 'a', encoding='utf-8')
+        if self.durable:
+            self._sync_directory()  # the log file may have just been created
+
+    def _read(self):
+        """return (snapshot seq, snapshot beliefs, log records, bytes of the log that parsed)."""
+        snapshot_seq, beliefs = 0, []
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, encoding='utf-8') as handle:
+                snapshot = json.load(handle)
+            snapshot_seq, beliefs = snapshot['seq'], snapshot['beliefs']
+        records, valid_bytes = [], 0
+        if os.path.exists(self.log_path):
+            with open(self.log_path, 'rb') as handle:
+                for line in handle:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break
+                    if not line.endswith(b'\n'):
+                        break
+                    records.append(record)
+                    valid_bytes += len(line)
+        return snapshot_seq, beliefs, records, valid_bytes
+
+    @property
+    def is_empty(self):
+        """whether the log holds no state yet: no snapshot and no records."""
+        return self.seq == 0 and not os.path.exists(self.snapshot_path)
+
+    def attach(self, belief_base):
+        """
+        bind the log to the base an agent starts from. an empty log takes a
+        non-empty base as its first snapshot, so recovery does not return only
+        the later deltas; a log that already holds state refuses a base that
+        differs from the one it recovers to.
+        """
+        if self.is_empty:
+            if belief_base.beliefs:
+                self.compact(belief_base)
+            return
+        fingerprint = 0
+        for formula in self._replay():
+            fingerprint ^= belief_digest(formula)
+        if fingerprint != belief_base.fingerprint:
+            raise ValueError(f"Belief base does not match the state logged in {self.directory}, "
+                             f"recover it from the log first")
+
+    def append(self, operation, formula, selector, added, removed, belief_base=None):
+        """
+        log the delta of one operation. when snapshot_every records have piled up,
+        the log is compacted, from belief_base if given (no need to replay).
+        """
+        self.seq += 1
+        record = {'seq': self.seq, 'op': operation, 'formula': formula, 'selector': selector,
+                  'added': sorted(added), 'removed': sorted(removed)}
+        self._handle.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._handle.flush()
+        if self.durable:
+            os.fsync(self._handle.fileno())
+        self.pending += 1
+        if self.snapshot_every and self.pending >= self.snapshot_every:
+            self.compact(belief_base)
+
+    def compact(self, belief_base=None):
+        """write a snapshot of the current state and drop the log records it covers."""
+        if belief_base is not None:
+            beliefs = sorted(belief_base.beliefs)
+        else:
+            beliefs = sorted(self._replay())
+        self._write_atomically(self.snapshot_path, json.dumps({'seq': self.seq, 'beliefs': beliefs},
+                                                              ensure_ascii=False))
+        #every record is now covered by the snapshot
+        self._handle.close()
+        self._write_atomically(self.log_path, '')
+        self._handle = open(self.log_path, 'a', encoding='utf-8')
+        self.pending = 0
+        print(f"[OPLOG] Snapshot at operation {self.seq} ({len(beliefs)} beliefs), log compacted")
+
+    def _write_atomically(self, path, text):
+        partial = f"{path}.{os.getpid()}.tmp"
+        with open(partial, 'w', encoding='utf-8') as handle:
+            handle.write(text)
+            handle.flush()
+            if self.durable:
+                os.fsync(handle.fileno())
+        os.replace(partial, path)  #readers see the old file or the new one, never half of it
+        if self.durable:
+            self._sync_directory()  # the rename itself only survives a crash once the directory is synced
+
+    def _sync_directory(self):
+        if not hasattr(os, 'O_DIRECTORY'):
+            return  # directories cannot be opened (or need no fsync) on this platform, e.g. Windows
+        descriptor = os.open(self.directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(descriptor)
+        finally:
+            os.close(descriptor)
+
+    def _replay(self):
+        """return the set of beliefs after the last logged operation."""
+        snapshot_seq, beliefs, records, _ = self._read()
+        beliefs = set(beliefs)
+        for record in records:
+            if record['seq'] <= snapshot_seq:
+                continue  # already in the snapshot (crash between snapshot and compaction)
+            beliefs.difference_update(record['removed'])
+            beliefs.update(record['added'])
+        return beliefs
+
+    def recover(self, belief_base=None):
+        """rebuild the belief base from the snapshot and the log, without entailment checks."""
+        belief_base = belief_base if belief_base is not None else BeliefBase()
+        for formula in self._replay():
+            belief_base.add_belief(formula)
+        print(f"[OPLOG] Recovered {len(belief_base.beliefs)} beliefs up to operation {self.seq}")
+        return belief_base
+
+    def close(self):
+        self._handle.close()
@@ -0,0 +1,77 @@
+import sys
+from collections import OrderedDict
+
+
+class RevisionCache:
+    """
+    bounded least-recently-used cache of revision and contraction outcomes.
+    keys are (base fingerprint, operation, formula, selector) and values are the
+    resulting base delta (added beliefs, removed beliefs), so an agent facing a
+    base it has seen before applies the delta instead of contracting again.
+    """
+
+    default = None
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (added, removed)
+        self._bytes = 0  # running total of key and delta sizes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _size(key, delta):
+        added, removed = delta
+        return (sys.getsizeof(key) + sys.getsizeof(key[2]) + sys.getsizeof(added) + sys.getsizeof(removed) +
+                sum(sys.getsizeof(formula) for formula in added) +
+                sum(sys.getsizeof(formula) for formula in removed))
+
+    def get(self, fingerprint, operation, formula, selector):
+        """return the stored (added, removed) delta or None."""
+        key = (fingerprint, operation, formula, selector)
+        delta = self._entries.get(key)
+        if delta is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return delta
+
+    def put(self, fingerprint, operation, formula, selector, added, removed):
+        """store the delta an operation produced on a base with this fingerprint."""
+        if self.max_entries <= 0:
+            return
+        key = (fingerprint, operation, formula, selector)
+        delta = (frozenset(added), frozenset(removed))
+        if key in self._entries:
+            self._bytes -= self._size(key, self._entries[key])
+        self._entries[key] = delta
+        self._entries.move_to_end(key)
+        self._bytes += self._size(key, delta)
+        while len(self._entries) > self.max_entries:
+            old_key, old_delta = self._entries.popitem(last=False)
+            self._bytes -= self._size(old_key, old_delta)
+            self.evictions += 1
+
+    def stats(self):
+        """return hit/miss counters, the hit rate and the memory held by the cache."""
+        lookups = self.hits + self.misses
+        return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions, 'memory_bytes': self._bytes}
+
+    def memory_usage(self):
+        """approximate bytes held by keys and deltas."""
+        return self._bytes
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+        self.hits = self.misses = self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+RevisionCache.default = RevisionCache()
@@ -0,0 +1,139 @@
+import argparse
+import contextlib
+import os
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from mastermind_base import MastermindBeliefBase
+from belief_revision import BeliefMastermindAgent
+from guess_strategy import STRATEGIES, GuessStrategy
+
+
+def percentile(values, fraction):
+    """nearest-rank percentile of a list of numbers."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(fraction * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def play_quietly(agent_factory, secret, code_length, max_turns):
+    """play one game without output; return (number of guesses or None, per-turn seconds)."""
+    latencies = []
+    with open(os.devnull, 'w') as sink, contextlib.redirect_stdout(sink):
+        start = time.perf_counter()
+        agent = agent_factory()
+        guess = agent.first_guess
+        latencies.append(time.perf_counter() - start)
+        for turn in range(1, max_turns + 1):
+            start = time.perf_counter()
+            feedback = agent.give_feedback(guess, secret)
+            if feedback[0] == code_length:
+                return turn, latencies
+            agent.revise_belief_base(guess, feedback)
+            guess = agent.make_guess()
+            latencies.append(time.perf_counter() - start)
+    return None, latencies
+
+
+def _play_chunk(colors, code_length, strategy, secrets, max_turns, feedback_table, options):
+    """worker: play every secret (given as indices) with one strategy."""
+    decoder = MastermindBeliefBase(colors, code_length)
+    guesser = GuessStrategy(strategy, **options)
+    results = []
+    for index in secrets:
+        secret = decoder.decode(index)
+        guesser.reseed(index)  #results must not depend on which games share a worker
+        factory = lambda: BeliefMastermindAgent(colors, code_length, guesser, feedback_table)
+        results.append(play_quietly(factory, secret, code_length, max_turns))
+    guesser.close()
+    return results
+
+
+def simulate(colors, code_length, strategies=('first',), sample=None, workers=None, max_turns=20,
+             seed=0, feedback_table=None, strategy_options=None):
+    """
+    play every possible secret (or a seeded random sample of them) with each
+    strategy across a process pool, and return a report per strategy.
+    """
+    num_codes = len(colors) ** code_length
+    if sample is None or sample >= num_codes:
+        secrets = list(range(num_codes))
+    else:
+        secrets = sorted(random.Random(seed).sample(range(num_codes), sample))
+    workers = workers or os.cpu_count() or 1
+    options = dict(strategy_options or {}, seed=seed)
+
+    reports = {}
+    for strategy in strategies:
+        chunks = [secrets[i::workers] for i in range(workers) if secrets[i::workers]]
+        started = time.perf_counter()
+        if workers > 1:
+            with ProcessPoolExecutor(workers) as executor:
+                futures = [executor.submit(_play_chunk, colors, code_length, strategy, chunk, max_turns,
+                                           feedback_table, options) for chunk in chunks]
+                results = [result for future in futures for result in future.result()]
+        else:
+            results = _play_chunk(colors, code_length, strategy, secrets, max_turns, feedback_table, options)
+        elapsed = time.perf_counter() - started
+        reports[strategy] = summarize(results, elapsed)
+    return reports
+
+
+def summarize(results, elapsed):
+    """turn (guesses, latencies) pairs into the report of one strategy."""
+    solved = [guesses for guesses, _ in results if guesses is not None]
+    latencies = [latency for _, turn_latencies in results for latency in turn_latencies]
+    return {
+        'games': len(results),
+        'failed': len(results) - len(solved),
+        'average_guesses': sum(solved) / len(solved) if solved else None,
+        'worst_guesses': max(solved) if solved else None,
+        'histogram': dict(sorted(Counter(solved).items())),
+        'games_per_second': len(results) / elapsed if elapsed else float('inf'),
+        'latency_p50': percentile(latencies, 0.50),
+        'latency_p90': percentile(latencies, 0.90),
+        'latency_p99': percentile(latencies, 0.99),
+        'latency_max': max(latencies) if latencies else 0.0,
+    }
+
+
+def print_report(reports):
+    for strategy, report in reports.items():
+        print(f"\n[SIMULATION] Strategy: {strategy}")
+        print(f"- games: {report['games']} ({report['failed']} not solved)")
+        if report['average_guesses'] is not None:
+            print(f"- guesses: average {report['average_guesses']:.3f}, worst {report['worst_guesses']}")
+        print(f"- histogram: {report['histogram']}")
+        print(f"- throughput: {report['games_per_second']:.1f} games/s")
+        print("- turn latency: " + ", ".join(f"{name} {report['latency_' + name] * 1000:.2f} ms"
+                                             for name in ('p50', 'p90', 'p99', 'max')))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play many Mastermind games and report solver statistics.")
+    parser.add_argument('--colors', type=int, default=6, help="number of colors")
+    parser.add_argument('--length', type=int, default=4, help="code length")
+    parser.add_argument('--strategies', nargs='+', default=['first'], choices=STRATEGIES)
+    parser.add_argument('--sample', type=int, default=None, help="number of random secrets (default: all)")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all CPUs)")
+    parser.add_argument('--max-turns', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--table-dir', default=None, help="use a precomputed feedback table stored here")
+    args = parser.parse_args()
+
+    colors = [f"color{i}" for i in range(args.colors)]
+    feedback_table = None
+    if args.table_dir:
+        from feedback_table import FeedbackTable
+        feedback_table = FeedbackTable.open(args.colors, args.length, args.table_dir)
+    reports = simulate(colors, args.length, args.strategies, args.sample, args.workers,
+                       args.max_turns, args.seed, feedback_table)
+    print_report(reports)
+
+
+if __name__ == "__main__":
+    main()
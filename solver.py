@@ -0,0 +1,244 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+#Incremental SAT solver
+
+def atom_of(literal):
+    """return the atom of a literal string such as 'A' or '¬A'."""
+    return literal[1:] if literal.startswith('¬') else literal
+
+
+class IncrementalSolver:
+    """
+    DPLL solver over clauses of literal strings, kept alive across updates.
+    clauses are added in named groups; every clause of a group carries the
+    negation of the group's activation literal, so a group is switched off
+    simply by no longer assuming its activation literal. the solver keeps a
+    satisfying model of the active clauses and only searches again when a new
+    clause is falsified by that model.
+    """
+
+    def __init__(self):
+        self._var_index = {}  # atom -> variable number
+        self._atoms = []  # variable number -> atom
+        self._clauses = []  # clauses as lists of integer literals
+        self._clause_groups = []  # activation variable of each clause
+        self._groups = {}  # group key -> activation variable
+        self._dead_clauses = 0  # clauses belonging to removed groups
+        self._phase = []  # last value of each variable, reused as decision polarity
+        self.model = {}  # atom -> bool for the active clauses
+        self.consistent = True
+        self.solve_calls = 0
+
+    #literal encoding: variable v is 2v when positive and 2v + 1 when negated
+
+    def _var(self, atom):
+        index = self._var_index.get(atom)
+        if index is None:
+            index = len(self._atoms)
+            self._var_index[atom] = index
+            self._atoms.append(atom)
+            self._phase.append(False)
+        return index
+
+    def _encode(self, literal):
+        if literal.startswith('¬'):
+            return 2 * self._var(literal[1:]) + 1
+        return 2 * self._var(literal)
+
+    def _new_activation(self, key):
+        return self._var(f"$act{len(self._groups)}:{key}")
+
+    def add_group(self, key, clauses):
+        """add the clauses of a group (e.g. one belief) and keep the model up to date."""
+        if key in self._groups:
+            return self.consistent
+        act = self._new_activation(key)
+        self._groups[key] = act
+        new_clauses = []
+        for clause in clauses:
+            encoded = [self._encode(lit) for lit in clause]
+            encoded.append(2 * act + 1)
+            self._clauses.append(encoded)
+            self._clause_groups.append(act)
+            new_clauses.append(clause)
+
+        if not self.consistent:
+            return False  # adding clauses never restores satisfiability, only remove_group re-solves
+        if self._extend_model(new_clauses):
+            return True
+        return self._resolve()
+
+    def remove_group(self, key):
+        """switch a group off through its activation literal."""
+        act = self._groups.pop(key, None)
+        if act is None:
+            return self.consistent
+        self._dead_clauses += self._clause_groups.count(act)
+        if self._dead_clauses > len(self._clauses) // 2:
+            self._compact()
+        if not self.consistent:
+            return self._resolve()  # removing beliefs can restore consistency
+        return True
+
+    def is_consistent(self):
+        """return whether the active clauses are satisfiable, in constant time."""
+        return self.consistent
+
+    def check(self, clauses):
+        """return whether the active clauses stay satisfiable together with extra clauses."""
+        return self.find_model(clauses) is not None
+
+    def find_model(self, clauses):
+        """return a model (atom -> bool) of the active clauses and extra clauses, or None."""
+        if not self.consistent:
+            return None
+        if all(self._satisfied(clause, self.model) for clause in clauses):
+            return dict(self.model)
+        assumptions = [2 * act for act in self._groups.values()]
+        extra = [[self._encode(lit) for lit in clause] for clause in clauses]
+        values = self._search(assumptions, extra)
+        if values is None:
+            return None
+        return {atom: values[index] for index, atom in enumerate(self._atoms)
+                if not atom.startswith('$') and values[index] is not None}
+
+    def satisfies(self, model, clauses):
+        """return whether a model (atom -> bool) satisfies every clause."""
+        return all(self._satisfied(clause, model) for clause in clauses)
+
+    def _satisfied(self, clause, model):
+        for lit in clause:
+            if lit.startswith('¬'):
+                if model.get(lit[1:]) is False:
+                    return True
+            elif model.get(lit) is True:
+                return True
+        return False
+
+    def _extend_model(self, clauses):
+        """try to satisfy new clauses with the current model, assigning unseen atoms if needed."""
+        for clause in clauses:
+            if self._satisfied(clause, self.model):
+                continue
+            free = [lit for lit in clause if atom_of(lit) not in self.model]
+            if not free:
+                return False
+            lit = free[0]
+            self.model[atom_of(lit)] = not lit.startswith('¬')
+        for atom, value in self.model.items():
+            self._phase[self._var_index[atom]] = value
+        return True
+
+    def _resolve(self):
+        assumptions = [2 * act for act in self._groups.values()]
+        values = self._search(assumptions, [])
+        self.consistent = values is not None
+        if self.consistent:
+            self.model = {atom: values[index] for index, atom in enumerate(self._atoms)
+                          if not atom.startswith('$') and values[index] is not None}
+        return self.consistent
+
+    def _compact(self):
+        """drop clauses of removed groups so they no longer cost search time."""
+        live = set(self._groups.values())
+        kept = [(clause, act) for clause, act in zip(self._clauses, self._clause_groups) if act in live]
+        self._clauses = [clause for clause, _ in kept]
+        self._clause_groups = [act for _, act in kept]
+        self._dead_clauses = 0
+
+    def _search(self, assumptions, extra):
+        """
+        DPLL search with two watched literals and chronological backtracking.
+        returns the variable values of a model, or None if unsatisfiable.
+        """
+        self.solve_calls += 1
+        num_vars = len(self._atoms)
+        value = [None] * num_vars
+        trail = []
+        watches = [[] for _ in range(2 * num_vars)]
+        clauses = self._clauses + extra
+
+        def assign(lit):
+            var = lit >> 1
+            current = value[var]
+            if current is None:
+                value[var] = not (lit & 1)
+                trail.append(lit)
+                return True
+            return current == (not (lit & 1))
+
+        pending = []
+        for clause in clauses:
+            if not clause:
+                return None
+            if len(clause) == 1:
+                pending.append(clause[0])
+            else:
+                watches[clause[0]].append(clause)
+                watches[clause[1]].append(clause)
+        for lit in assumptions + pending:
+            if not assign(lit):
+                return None
+
+        def lit_true(lit):
+            current = value[lit >> 1]
+            return current is not None and current == (not (lit & 1))
+
+        def lit_false(lit):
+            current = value[lit >> 1]
+            return current is not None and current == bool(lit & 1)
+
+        def propagate(head):
+            while head < len(trail):
+                false_lit = trail[head] ^ 1
+                head += 1
+                watching = watches[false_lit]
+                i = 0
+                while i < len(watching):
+                    clause = watching[i]
+                    if clause[0] == false_lit:
+                        clause[0], clause[1] = clause[1], clause[0]
+                    if lit_true(clause[0]):
+                        i += 1
+                        continue
+                    for k in range(2, len(clause)):
+                        if not lit_false(clause[k]):
+                            clause[1], clause[k] = clause[k], clause[1]
+                            watches[clause[1]].append(clause)
+                            watching[i] = watching[-1]
+                            watching.pop()
+                            break
+                    else:
+                        if not assign(clause[0]):
+                            return False, head
+                        i += 1
+            return True, head
+
+        ok, head = propagate(0)
+        if not ok:
+            return None
+
+        decisions = []  # (trail length before decision, literal, already flipped)
+        while True:
+            var = next((v for v in range(num_vars) if value[v] is None), None)
+            if var is None:
+                for v in range(num_vars):
+                    self._phase[v] = value[v]
+                return value
+            lit = 2 * var + (0 if self._phase[var] else 1)
+            decisions.append((len(trail), lit, False))
+            assign(lit)
+            ok, head = propagate(len(trail) - 1)
+            while not ok:
+                while decisions and decisions[-1][2]:
+                    decisions.pop()
+                if not decisions:
+                    return None
+                size, lit, _ = decisions.pop()
+                for undone in trail[size:]:
+                    value[undone >> 1] = None
+                del trail[size:]
+                decisions.append((size, lit ^ 1, True))
+                assign(lit ^ 1)
+                ok, head = propagate(size)
@@ -2,24 +2,60 @@ from belief_base import BeliefBase
 from contraction import BeliefContraction
 from expansion import BeliefExpansion
 from entailment import Resolution
+from revision_cache import RevisionCache
 import copy
 
-from mastermind_agent import MastermindAgent
-
 
 class BeliefRevisionAgent:
-    def __init__(self, belief_base=None):
+    def __init__(self, belief_base=None, cache=None, log=None):
         self.belief_base = belief_base or BeliefBase()
+        #outcomes of contract/revise are shared across agents unless a cache of its own is given
+        self.cache = cache if cache is not None else RevisionCache.default
+        self.log = log  # OperationLog receiving the delta of every top-level operation
+        if log is not None:
+            log.attach(self.belief_base)  # the starting base becomes the log's first snapshot
+        self._depth = 0  # > 0 while revise runs its inner contraction and expansion
+
+    def _replay(self, operation, formula, selector):
+        """apply a cached outcome of operation on an identical base; return whether there was one."""
+        fingerprint = getattr(self.belief_base, 'fingerprint', None)
+        delta = self.cache.get(fingerprint, operation, formula, selector) if fingerprint is not None else None
+        if delta is None:
+            return False
+        added, removed = delta
+        for belief in removed:
+            self.belief_base.remove_belief(belief)
+        for belief in added:
+            self.belief_base.add_belief(belief)
+        print(f"[CACHE] Reused {operation} outcome for '{formula}': +{len(added)} -{len(removed)} beliefs")
+        return True
+
+    def _remember(self, fingerprint, before, operation, formula, selector):
+        if fingerprint is not None:
+            after = self.belief_base.beliefs
+            self.cache.put(fingerprint, operation, formula, selector, after - before, before - after)
+
+    def _journal(self, operation, formula, selector, added, removed):
+        """write the delta of a top-level operation to the operation log, if any."""
+        if self.log is not None and self._depth == 0:
+            self.log.append(operation, formula, selector, added, removed, self.belief_base)
 
     def expand(self, formula):
         print(f"[EXPANSION] Adding formula '{formula}' to belief base")
         # use the normalized formula for expansion to maintain extensionality
         normalized = self.normalize_formula(formula)
+        added = [] if normalized in self.belief_base.beliefs else [normalized]
         BeliefExpansion(self.belief_base).expand(normalized)
+        self._journal('expand', formula, None, added, [])
 
     def contract(self, formula, selector='max'):
         print(f"[CONTRACTION] Removing entailment of '{formula}' using {selector} selection")
-        BeliefContraction(self.belief_base, selector).partial_meet_contract(formula)
+        before = set(self.belief_base.beliefs)
+        if not self._replay('contract', formula, selector):
+            fingerprint = getattr(self.belief_base, 'fingerprint', None)
+            BeliefContraction(self.belief_base, selector).partial_meet_contract(formula)
+            self._remember(fingerprint, before, 'contract', formula, selector)
+        self._journal('contract', formula, selector, [], before - self.belief_base.beliefs)
 
     def normalize_formula(self, formula):
         """normalize a formula by removing double negations"""
@@ -39,6 +75,18 @@ class BeliefRevisionAgent:
 
     def revise(self, formula, selector='max'):
         print(f"[REVISION] Starting revision with formula '{formula}'")
+        before = set(self.belief_base.beliefs)
+        if not self._replay('revise', formula, selector):
+            self._depth += 1
+            try:
+                self._revise(formula, selector, before)
+            finally:
+                self._depth -= 1
+        after = self.belief_base.beliefs
+        self._journal('revise', formula, selector, after - before, before - after)
+
+    def _revise(self, formula, selector, before):
+        fingerprint = getattr(self.belief_base, 'fingerprint', None)
 
         # normalize formula for contraction purposes
         normalized_formula = self.normalize_formula(formula)
@@ -53,11 +101,15 @@ class BeliefRevisionAgent:
             negated = f"¬({normalized_formula})"
             print(f"[NORMALIZATION] Created negation for contraction: '{negated}'")
 
-        #perform contraction
-        self.contract(negated, selector)
+        #perform contraction, unless the formula is consistent with the current model
+        if self.belief_base.solver is not None and self.belief_base.is_consistent_with(normalized_formula):
+            print(f"[REVISION] '{formula}' is consistent with the belief base, skipping contraction")
+        else:
+            self.contract(negated, selector)
 
         # perform expansion - the expand method will normalize the formula
         self.expand(formula)
+        self._remember(fingerprint, before, 'revise', formula, selector)
         print(f"[REVISION] Completed revision with '{formula}'")
 
 
@@ -177,6 +229,9 @@ def batch_test():
         agent = BeliefRevisionAgent(copy.deepcopy(base))
         agent.revise(fml)
         test_agm_postulates(base, fml, agent.belief_base, equiv)
+    stats = RevisionCache.default.stats()
+    print(f"[CACHE] Revision cache: {stats['hits']} hits, {stats['misses']} misses "
+          f"({stats['hit_rate']:.0%}), {stats['entries']} entries, {stats['memory_bytes']} bytes")
     print("\n[BATCH TEST] All batch tests completed")
 
 
@@ -220,6 +275,7 @@ def main():
             secret_code = ('blue', 'green', 'red', 'yellow')
 
             print("Starting the Mastermind game...")
+            from mastermind_agent import MastermindAgent  #only load the Mastermind stack when it is played
 
             #create and play the game with the belief revision agent
             agent = MastermindAgent(colors, code_length)
@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, Python integers serve as bit vectors instead
+    np = None
+
+from entailment import CNFConverter, Engine, EngineCache
+
+#Bit-parallel truth tables
+
+MAX_ATOMS = 24  # 2 ** 24 assignments = 2 MiB per vector
+AUTO_ATOMS = 20  # Resolution.entails model-checks bases with at most this many atoms
+CACHED_ATOMS = 16  # tables this small keep the vectors of the formulas they evaluated (8 KiB each)
+CACHED_VECTORS = 256  # formula vectors a table keeps when its Engine sets no max_entries
+NUMPY_MIN_ATOMS = 13  # below this a Python integer is faster than a NumPy vector
+_WORD_PATTERNS = [0xAAAAAAAAAAAAAAAA, 0xCCCCCCCCCCCCCCCC, 0xF0F0F0F0F0F0F0F0,
+                  0xFF00FF00FF00FF00, 0xFFFF0000FFFF0000, 0xFFFFFFFF00000000]
+
+
+def signature(formula, cache=None):
+    """return the atoms of a formula string, read off its parse tree (no CNF conversion)."""
+    cache = cache or Engine.current().cache('signature')
+    cached = cache.get(formula)
+    if cached is not None:
+        return cached
+    atoms = set()
+    stack = [CNFConverter.parse(formula)]
+    while stack:
+        node = stack.pop()
+        if node.op in {'∧', '∨', '→', '↔'}:
+            stack.append(node.left)
+            stack.append(node.right)
+        elif node.op == '¬':
+            stack.append(node.left)
+        elif node.op != '⊤':
+            atoms.add(node.op)
+    return cache.put(formula, frozenset(atoms))
+
+
+def applicable(formulas, max_atoms=MAX_ATOMS):
+    """return the joint signature of formulas if it is small enough for a truth table, else None."""
+    cache = Engine.current().cache('signature')
+    atoms = set()
+    for formula in formulas:
+        atoms |= signature(formula, cache)
+        if len(atoms) > max_atoms:
+            return None
+    return atoms
+
+
+class TruthTable:
+    """
+    evaluates formulas over all 2 ** n assignments of n atoms at once. every
+    formula becomes a bit vector with one bit per assignment, packed into uint64
+    words (NumPy) or a single Python integer, and connectives are bitwise
+    operations over the whole vector. sub-formulas shared in the parse DAG are
+    evaluated once and dropped as soon as their last parent has used them; small
+    tables also remember the vectors of recently evaluated formulas, at most
+    the active Engine's max_entries (CACHED_VECTORS if it has none).
+    """
+
+    def __init__(self, atoms):
+        self.atoms = sorted(atoms)
+        if len(self.atoms) > MAX_ATOMS:
+            raise ValueError(f"Truth table over {len(self.atoms)} atoms exceeds {MAX_ATOMS}")
+        self.size = 1 << len(self.atoms)
+        self.vectorized = np is not None and len(self.atoms) >= NUMPY_MIN_ATOMS
+        if self.vectorized:
+            self.ones = np.full(self.size // 64, np.uint64(0xFFFFFFFFFFFFFFFF), dtype=np.uint64)
+        else:
+            self.ones = (1 << self.size) - 1
+        self._atom_vectors = {}
+        self._formula_vectors = None
+        if len(self.atoms) <= CACHED_ATOMS:
+            self._formula_vectors = EngineCache(Engine.current().max_entries or CACHED_VECTORS)
+
+    def atom(self, name):
+        """bit vector of an atom: bit k is set iff the atom is true in assignment k."""
+        vector = self._atom_vectors.get(name)
+        if vector is not None:
+            return vector
+        i = self.atoms.index(name)
+        if self.vectorized:
+            if i < 6:
+                vector = np.full(self.size // 64, np.uint64(_WORD_PATTERNS[i]), dtype=np.uint64)
+            else:
+                words = np.arange(self.size // 64, dtype=np.uint64)
+                vector = np.where((words >> np.uint64(i - 6)) & np.uint64(1), self.ones, np.uint64(0))
+        else:
+            period = 1 << (i + 1)
+            vector = ((1 << (1 << i)) - 1) << (1 << i)  # one period: 2 ** i zeros then 2 ** i ones
+            while period < self.size:
+                vector |= vector << period
+                period <<= 1
+        self._atom_vectors[name] = vector
+        return vector
+
+    def evaluate(self, formula):
+        """return the bit vector of the models of a formula string."""
+        if self._formula_vectors is not None:
+            vector = self._formula_vectors.get(formula)
+            if vector is None:
+                vector = self._formula_vectors.put(formula, self._evaluate(formula))
+            return vector
+        return self._evaluate(formula)
+
+    def _evaluate(self, formula):
+        root = CNFConverter.parse(formula)
+        #post-order over the DAG, counting parents so intermediate vectors can be freed early
+        parents = {root: 1}
+        visited = set()
+        order = []
+        stack = [(root, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if expanded:
+                order.append(node)
+                continue
+            if node in visited:
+                continue
+            visited.add(node)
+            stack.append((node, True))
+            children = (node.left, node.right) if node.op in {'∧', '∨', '→', '↔'} else \
+                (node.left,) if node.op == '¬' else ()
+            for child in children:
+                parents[child] = parents.get(child, 0) + 1
+                if child not in visited:
+                    stack.append((child, False))
+
+        values = {}
+
+        def take(child):
+            value = values[child]
+            parents[child] -= 1
+            if parents[child] == 0:
+                del values[child]
+            return value
+
+        for node in order:
+            op = node.op
+            if op == '∧':
+                values[node] = take(node.left) & take(node.right)
+            elif op == '∨':
+                values[node] = take(node.left) | take(node.right)
+            elif op == '→':
+                values[node] = (self.ones ^ take(node.left)) | take(node.right)
+            elif op == '↔':
+                values[node] = self.ones ^ (take(node.left) ^ take(node.right))
+            elif op == '¬':
+                values[node] = self.ones ^ take(node.left)
+            elif op == '⊤':
+                values[node] = self.ones
+            else:
+                values[node] = self.atom(op)
+        return values[root]
+
+    def models(self, formulas):
+        """bit vector of the assignments satisfying every formula."""
+        result = self.ones
+        for formula in formulas:
+            result = result & self.evaluate(formula)
+        return result
+
+    def empty(self, vector):
+        if self.vectorized:
+            return not vector.any()
+        return vector == 0
+
+    def count(self, vector):
+        """number of assignments in a bit vector."""
+        if self.vectorized:
+            return int(np.bitwise_count(vector).sum()) if hasattr(np, 'bitwise_count') else \
+                int(np.unpackbits(vector.view(np.uint8)).sum())
+        return vector.bit_count()
+
+
+def _table(formulas, atoms=None):
+    """return the (cached) truth table over the signature of formulas."""
+    atoms = atoms if atoms is not None else applicable(formulas)
+    if atoms is None:
+        raise ValueError(f"Truth tables are limited to {MAX_ATOMS} atoms")
+    key = frozenset(atoms)
+    cache = Engine.current().cache('truth_tables')
+    table = cache.get(key)
+    if table is None:
+        table = cache.put(key, TruthTable(atoms))
+    return table
+
+
+def entails(beliefs, query, atoms=None):
+    """
+    check whether the beliefs entail query by model checking. atoms, the joint
+    signature from applicable(), can be passed in by callers that already have it.
+    """
+    beliefs = list(beliefs)
+    table = _table(beliefs + [query], atoms)
+    return table.empty(table.models(beliefs) & (table.ones ^ table.evaluate(query)))
+
+
+def is_consistent(beliefs):
+    """check whether the beliefs have a common model."""
+    beliefs = list(beliefs)
+    table = _table(beliefs)
+    return not table.empty(table.models(beliefs))
+
+
+def equivalent(formula1, formula2):
+    """check whether two formulas have exactly the same models."""
+    table = _table([formula1, formula2])
+    return table.empty(table.evaluate(formula1) ^ table.evaluate(formula2))